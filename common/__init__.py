@@ -0,0 +1 @@
+"""Code shared by the solvers of the other directories."""
@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.distance_cache')
+
+EXACT = 'EXACT'  # euclidean distance
+EUC_2D = 'EUC_2D'  # TSPLIB: euclidean distance rounded to the nearest integer
+
+
+def distance_rows(coordinates, start, end, metric=EXACT):
+    # rows start..end - 1 of the distance matrix
+    difference = coordinates[start:end, None, :] - coordinates[None, :, :]
+    distance = np.sqrt((difference * difference).sum(axis=2))
+    if metric == EUC_2D:
+        distance = np.floor(distance + 0.5)
+    elif metric != EXACT:
+        raise ValueError('unknown metric %s' % metric)
+    return distance
+
+
+def block_size(num_node, memory=64 * 2 ** 20):
+    # rows computed together, their differences take about memory bytes
+    return max(1, memory // max(1, 16 * num_node))
+
+
+def check_dtype(metric, dtype):
+    # ValueError for an integer dtype with the EXACT metric, its distances would be truncated
+    if metric == EXACT and np.issubdtype(dtype, np.integer):
+        raise ValueError('integer dtype %s needs the EUC_2D metric, EXACT distances are not integers' % np.dtype(dtype))
+
+
+def distance_matrix(coordinates, metric=EXACT, dtype=np.float64, out=None):
+    # n x n matrix of the distances between the rows of coordinates (n x 2), filled block by block
+    # dtype: float64, float32, or int32 with the EUC_2D metric, ValueError for an integer dtype with EXACT
+    check_dtype(metric, dtype if out is None else out.dtype)
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    num_node = len(coordinates)
+    if out is None:
+        out = np.empty((num_node, num_node), dtype=dtype)
+    step = block_size(num_node)
+    for start in range(0, num_node, step):
+        end = min(start + step, num_node)
+        out[start:end] = distance_rows(coordinates, start, end, metric)
+    return out
+
+
+def cached_distance_matrix(coordinates, metric=EXACT, dtype=np.float64, name='instance', directory=DEFAULT_DIRECTORY):
+    # distance_matrix stored in directory as a .npy file per instance and returned memory-mapped read only,
+    # the file name holds a hash of the coordinates, the metric and the dtype
+    check_dtype(metric, dtype)
+    coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+    dtype = np.dtype(dtype)
+    digest = hashlib.sha256(('%s%s%r' % (metric, dtype.str, coordinates.shape)).encode())
+    digest.update(coordinates.tobytes())
+    path = os.path.join(directory, '%s-%s.npy' % (name, digest.hexdigest()[:16]))
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        temp_path = '%s.%i.tmp' % (path, os.getpid())
+        out = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=(len(coordinates),) * 2)
+        distance_matrix(coordinates, metric, dtype, out)
+        out.flush()
+        del out
+        os.replace(temp_path, path)
+    return np.load(path, mmap_mode='r')
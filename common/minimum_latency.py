@@ -0,0 +1,205 @@
+import time
+
+import numpy as np
+
+SWAP = 'swap'
+OR_OPT = 'or-opt'
+TWO_OPT = '2-opt'
+
+
+def latency(distance, tour):
+    # sum of the arrival times of the nodes, the path starts at tour[0] at time 0 and does not come back
+    tour = np.asarray(tour)
+    edges = distance[tour[:-1], tour[1:]]
+    return float(((len(tour) - 1 - np.arange(len(edges))) * edges).sum())
+
+
+def nearest_neighbors(distance, k, block=1024):
+    # neighbors[u]: the k nearest other nodes of u, rows are taken block by block
+    n = len(distance)
+    k = max(min(k, n - 1), 1)
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, block):
+        rows = np.array(distance[start:start + block], dtype=np.float64)
+        rows[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+        neighbors[start:start + len(rows)] = np.argpartition(rows, k - 1, axis=1)[:, :k]
+    return neighbors
+
+
+class MinimumLatencyHeuristic:
+    """ GRASP with variable neighborhood descent for the minimum latency path of MinimumLatencyProblem.
+
+    Edge k of a tour joins positions k and k + 1 and is counted by the n - 1 - k nodes after it. With the prefix
+    sums S[k] = e_0 + .. + e_(k-1) and T[k] = 0 e_0 + .. + (k-1) e_(k-1) of the edge lengths e, every move is
+    evaluated in O(1), the edges it does not touch only move by a known number of positions:
+      - swap of the nodes at positions i and j,
+      - or-opt: a block of 1 to 3 nodes exchanged with the adjacent block before or after it,
+      - 2-opt: reversal of positions i..j, edge k of the reversed part becomes edge i + j - 1 - k.
+    The candidate moves put a node next to one of its nearest neighbors. They are evaluated together with numpy
+    and every round applies the best improving moves which touch disjoint edges.
+    """
+
+    def __init__(self, distance, rcl_size=3, neighbors=10, max_iterations=100, time_limit=10, seed=0):
+        self.distance = distance  # n x n, symmetric
+        self.n = len(distance)
+        self.rcl_size = rcl_size  # the construction goes to one of the rcl_size nearest unvisited nodes
+        self.neighbors = nearest_neighbors(distance, neighbors)
+        self.max_iterations = max_iterations  # GRASP iterations
+        self.time_limit = time_limit  # seconds
+        self.rng = np.random.default_rng(seed)
+        self.tour = None  # tour[k]: node at position k
+        self.position = None  # position[u]: position of node u
+        self.padded = None  # tour with a node before position 0 and after position n - 1, their edges weigh 0
+        self.prefix = None  # S
+        self.weighted_prefix = None  # T
+        self.cost = 0
+        self.best_tour = None
+        self.best_cost = float('inf')
+        self.iterations = 0
+        self.moves = {SWAP: 0, OR_OPT: 0, TWO_OPT: 0}  # moves applied
+        self.run_time = 0
+
+    def construct(self, rcl_size):
+        # greedy randomized path from a random node
+        current = int(self.rng.integers(self.n))
+        tour = [current]
+        remaining = np.delete(np.arange(self.n), current)
+        while len(remaining):
+            d = self.distance[current, remaining]
+            size = min(rcl_size, len(remaining))
+            candidates = np.argpartition(d, size - 1)[:size] if size < len(remaining) else np.arange(size)
+            pick = candidates[self.rng.integers(size)]
+            current = int(remaining[pick])
+            tour.append(current)
+            remaining[pick] = remaining[-1]
+            remaining = remaining[:-1]
+        return np.array(tour, dtype=np.int64)
+
+    def set_tour(self, tour):
+        self.tour = tour
+        self.position = np.empty(self.n, dtype=np.int64)
+        self.position[tour] = np.arange(self.n)
+        self.padded = np.concatenate((tour[:1], tour, tour[-1:]))
+        edges = self.distance[tour[:-1], tour[1:]].astype(np.float64)
+        self.prefix = np.concatenate(([0], np.cumsum(edges)))
+        self.weighted_prefix = np.concatenate(([0], np.cumsum(np.arange(self.n - 1) * edges)))
+        self.cost = float(((self.n - 1 - np.arange(self.n - 1)) * edges).sum())
+
+    def node(self, k):
+        return self.padded[k + 1]
+
+    def weight(self, k):
+        return np.where((k >= 0) & (k <= self.n - 2), self.n - 1 - k, 0)
+
+    def length(self, i, j):
+        # length of the edge between the nodes at positions i and j
+        return self.distance[self.node(i), self.node(j)]
+
+    def swap_delta(self, i, j):
+        # i + 2 <= j
+        a, b = self.node(i), self.node(j)
+        before_i, after_i, before_j, after_j = self.node(i - 1), self.node(i + 1), self.node(j - 1), self.node(j + 1)
+        d = self.distance
+        return (self.weight(i - 1) * (d[before_i, b] - d[before_i, a])
+                + self.weight(i) * (d[b, after_i] - d[a, after_i])
+                + self.weight(j - 1) * (d[before_j, a] - d[before_j, b])
+                + self.weight(j) * (d[a, after_j] - d[b, after_j]))
+
+    def exchange_delta(self, a, b, c):
+        # blocks a..b - 1 and b..c - 1 exchanged, a < b < c <= n
+        prefix = self.prefix
+        return (self.weight(a - 1) * (self.length(a - 1, b) - self.length(a - 1, a))
+                + self.weight(a + c - b - 1) * self.length(c - 1, a) - self.weight(b - 1) * self.length(b - 1, b)
+                + self.weight(c - 1) * (self.length(b - 1, c) - self.length(c - 1, c))
+                - (c - b) * (prefix[b - 1] - prefix[a]) + (b - a) * (prefix[c - 1] - prefix[b]))
+
+    def reverse_delta(self, i, j):
+        # positions i..j reversed, i < j
+        prefix, weighted_prefix = self.prefix, self.weighted_prefix
+        return (self.weight(i - 1) * (self.length(i - 1, j) - self.length(i - 1, i))
+                + self.weight(j) * (self.length(i, j + 1) - self.length(j, j + 1))
+                + 2 * (weighted_prefix[j] - weighted_prefix[i]) - (i + j - 1) * (prefix[j] - prefix[i]))
+
+    def candidates(self, neighborhood):
+        # return (delta, first position, last position, positions of the move) of the moves which put a node
+        # next to one of its neighbors
+        k = self.neighbors.shape[1]
+        u = np.repeat(self.position, k)
+        v = self.position[self.neighbors].ravel()
+        if neighborhood == SWAP:
+            # u goes just after or just before v
+            i = np.concatenate((u, u))
+            j = np.concatenate((v + 1, v - 1))
+            i, j = np.minimum(i, j), np.maximum(i, j)
+            keep = (i >= 0) & (j < self.n) & (j - i >= 2)
+            i, j = i[keep], j[keep]
+            return self.swap_delta(i, j), i, j, (i, j)
+        if neighborhood == OR_OPT:
+            # the block of 1 to 3 nodes starting at u goes just after v
+            moves = []
+            for size in (1, 2, 3):
+                keep = (v > u + size - 1) & (u + size <= self.n)
+                moves.append((u[keep], u[keep] + size, v[keep] + 1))
+                keep = (v + 1 < u) & (u + size <= self.n)
+                moves.append((v[keep] + 1, u[keep], u[keep] + size))
+            a, b, c = (np.concatenate(part) for part in zip(*moves))
+            return self.exchange_delta(a, b, c), a, c - 1, (a, b, c)
+        # 2-opt, the edge (u, v) is created
+        i = np.concatenate((u + 1, u))
+        j = np.concatenate((v, v - 1))
+        keep = j > i
+        i, j = i[keep], j[keep]
+        return self.reverse_delta(i, j), i, j, (i, j)
+
+    def improve(self, neighborhood):
+        # apply the best improving moves of the neighborhood which touch disjoint edges, return False if there is none
+        delta, first, last, positions = self.candidates(neighborhood)
+        improving = np.flatnonzero(delta < -1e-9 * max(self.cost, 1))
+        if len(improving) == 0:
+            return False
+        used = np.zeros(self.n + 1, dtype=bool)  # used[k + 1]: edge k is changed by an applied move
+        tour = self.tour.copy()
+        for m in improving[np.argsort(delta[improving], kind='stable')].tolist():
+            lo, hi = int(first[m]), int(last[m])
+            # the move changes positions lo..hi and the edges lo - 1..hi
+            if used[lo:hi + 2].any():
+                continue
+            used[lo:hi + 2] = True
+            if neighborhood == SWAP:
+                tour[lo], tour[hi] = tour[hi], tour[lo]
+            elif neighborhood == OR_OPT:
+                a, b, c = (int(p[m]) for p in positions)
+                tour[a:c] = np.concatenate((tour[b:c], tour[a:b]))
+            else:
+                tour[lo:hi + 1] = tour[lo:hi + 1][::-1].copy()
+            self.moves[neighborhood] += 1
+        self.set_tour(tour)
+        return True
+
+    def descent(self, deadline):
+        # variable neighborhood descent, back to the first neighborhood after every improvement
+        neighborhoods = (SWAP, OR_OPT, TWO_OPT)
+        k = 0
+        while k < len(neighborhoods) and time.time() < deadline:
+            k = 0 if self.improve(neighborhoods[k]) else k + 1
+
+    def solve(self):
+        # return the best tour and its latency
+        start_time = time.time()
+        deadline = start_time + self.time_limit
+        while self.iterations < self.max_iterations and (self.iterations == 0 or time.time() < deadline):
+            # the first tour is the nearest neighbor path
+            self.set_tour(self.construct(1 if self.iterations == 0 else self.rcl_size))
+            self.descent(deadline)
+            if self.cost < self.best_cost:
+                self.best_tour, self.best_cost = self.tour.copy(), self.cost
+            self.iterations += 1
+        self.run_time = time.time() - start_time
+        return self.best_tour, self.best_cost
+
+    def print_result(self):
+        print('\nStatistics')
+        print('  - latency        : %f' % self.best_cost)
+        print('  - iterations     : %i' % self.iterations)
+        print('  - moves          : %s' % ', '.join('%s %i' % item for item in self.moves.items()))
+        print('  - run time       : %f s' % self.run_time)
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+from ortools import __version__ as ortools_version
+from ortools.linear_solver import linear_solver_pb2
+from ortools.sat.python import cp_model
+from google.protobuf.message import DecodeError
+
+CP = 'cp'  # CpModelProto
+MIP = 'mip'  # MPModelProto
+
+REPOSITORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_DIRECTORY = os.path.join(REPOSITORY, '.model_cache')
+
+
+def update_digest(digest, value):
+    # feed value to digest, dicts and sets in sorted order so that equal instances give the same key
+    if isinstance(value, dict):
+        digest.update(b'd%i' % len(value))
+        for item in sorted(value.items(), key=lambda item: repr(item[0])):
+            update_digest(digest, item)
+    elif isinstance(value, (set, frozenset)):
+        digest.update(b's%i' % len(value))
+        for item in sorted(value, key=repr):
+            update_digest(digest, item)
+    elif isinstance(value, (list, tuple, range)):
+        digest.update(b'l%i' % len(value))
+        for item in value:
+            update_digest(digest, item)
+    elif isinstance(value, np.ndarray):
+        digest.update(('a%s%r' % (value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(('v%s:%r' % (type(value).__name__, value)).encode())
+
+
+class ModelCache:
+    """ Models on disk, keyed by a hash of the instance data and of the model parameters.
+
+    A CP-SAT model is stored as its CpModelProto in text format, a linear solver model as its serialized
+    MPModelProto. The variables of the model are stored as {name: (keys, proto indices)} and bound again to
+    the loaded proto, so a hit skips create_var / add_constrain. The least recently used entries are removed
+    when there are more than max_entries.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_entries=32):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.build_time_saved = 0  # build time of the hits minus their load time
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, kind, owner, *parts):
+        # kind: CP or MIP, owner: the object building the model, parts: instance data and model parameters
+        # the owner is given by the file of its class, the scripts all run as __main__
+        owner_class = type(owner)
+        owner_file = getattr(sys.modules.get(owner_class.__module__), '__file__', None)
+        owner_module = owner_class.__module__
+        if owner_file:
+            owner_module = os.path.relpath(os.path.abspath(owner_file), REPOSITORY)
+        digest = hashlib.sha256()
+        update_digest(digest, (ortools_version, kind, owner_module, owner_class.__qualname__) + parts)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def discard(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def read(self, key, kind):
+        # entry of key, None when there is none, corrupt entries and entries of another kind are removed
+        try:
+            with open(self.path(key), 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+            self.discard(key)
+            return None
+        except OSError:
+            # unreadable for now (permissions, I/O), the entry is kept
+            return None
+        if not isinstance(entry, dict) or entry.get('kind') != kind:
+            self.discard(key)
+            return None
+        return entry
+
+    def hit(self, key, build_time, start_time):
+        os.utime(self.path(key))
+        self.hits += 1
+        self.build_time_saved += build_time - (time.time() - start_time)
+
+    def miss(self, key=None):
+        # key: entry which could not be loaded, it is removed
+        if key is not None:
+            self.discard(key)
+        self.misses += 1
+
+    def write(self, key, entry):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            os.remove(path)
+
+    @staticmethod
+    def indices(variables, index):
+        # {name: {key: var}} to {name: (keys, proto indices)}
+        return {name: (list(var_dict), np.array([index(var) for var in var_dict.values()], dtype=np.int64))
+                for name, var_dict in variables.items()}
+
+    def store_cp(self, key, model, variables, build_time):
+        # variables: {name: {key: var of model}}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.txt')
+        os.close(fd)
+        try:
+            model.ExportToFile(temp_path)
+            with open(temp_path, 'r') as f:
+                text = f.read()
+        finally:
+            os.remove(temp_path)
+        self.write(key, {'kind': CP, 'model': text, 'variables': self.indices(variables, lambda var: var.Index()),
+                         'build_time': build_time})
+
+    def load_cp(self, key, model):
+        # load the cached proto into the empty model, return {name: {key: var}} or None on a miss
+        # the model is left empty on a miss
+        start_time = time.time()
+        entry = self.read(key, CP)
+        if entry is None:
+            self.miss()
+            return None
+        if not model.Proto().parse_text_format(entry['model']):
+            model.Proto().copy_from(cp_model.CpModel().Proto())
+            self.miss(key)
+            return None
+        proto = model.Proto()
+        variables = {}
+        for name, (keys, indices) in entry['variables'].items():
+            variables[name] = dict(zip(keys, [cp_model.IntVar(proto, i) for i in indices.tolist()]))
+        self.hit(key, entry['build_time'], start_time)
+        return variables
+
+    def store_mip(self, key, solver, variables, build_time):
+        proto = linear_solver_pb2.MPModelProto()
+        solver.ExportModelToProto(proto)
+        self.write(key, {'kind': MIP, 'model': proto.SerializeToString(),
+                         'variables': self.indices(variables, lambda var: var.index()),
+                         'build_time': build_time})
+
+    def load_mip(self, key, solver):
+        # load the cached proto into the empty solver, return {name: {key: var}} or None on a miss
+        # the solver is left empty on a miss
+        start_time = time.time()
+        entry = self.read(key, MIP)
+        if entry is None:
+            self.miss()
+            return None
+        proto = linear_solver_pb2.MPModelProto()
+        try:
+            proto.ParseFromString(entry['model'])
+        except DecodeError:
+            self.miss(key)
+            return None
+        error = solver.LoadModelFromProtoKeepNames(proto)
+        if error:
+            # duplicate variable names, the solver names them again
+            error = solver.LoadModelFromProto(proto)
+        if error:
+            solver.Clear()
+            self.miss(key)
+            return None
+        solver_variables = solver.variables()
+        variables = {}
+        for name, (keys, indices) in entry['variables'].items():
+            variables[name] = dict(zip(keys, [solver_variables[i] for i in indices.tolist()]))
+        self.hit(key, entry['build_time'], start_time)
+        return variables
+
+    def print_stats(self):
+        print('\nModel cache')
+        print('  - hits             : %i' % self.hits)
+        print('  - misses           : %i' % self.misses)
+        print('  - build time saved : %f s' % self.build_time_saved)
+
@@ -0,0 +1 @@
+"""Readers of the instance files: TSPLIB / CVRPLIB files, CVRPLIB routes and semicolon edge lists."""
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from common.parsers.edge_list import read_edge_list
+from common.parsers.tsplib import read_routes, read_tsplib
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.instance_cache')
+
+# extension: reader
+READERS = {
+    '.tsp': read_tsplib,
+    '.atsp': read_tsplib,
+    '.vrp': read_tsplib,
+    '.tour': read_tsplib,
+    '.opt': read_routes,
+    '.sol': read_routes,
+    '.txt': read_edge_list,
+}
+
+
+def to_arrays(instance):
+    # instance of a reader to the arrays of a .npz file
+    arrays = {}
+    for name, value in instance.items():
+        if name == 'specification':
+            arrays[name] = np.array(json.dumps(value))
+        elif name == 'routes':
+            arrays['route_nodes'] = np.concatenate(value) if value else np.zeros(0, dtype=np.int64)
+            arrays['route_starts'] = np.cumsum([0] + [len(route) for route in value])
+        else:
+            arrays[name] = np.asarray(value)
+    return arrays
+
+
+def from_arrays(arrays):
+    instance = {}
+    for name in arrays.files:
+        if name == 'specification':
+            instance[name] = json.loads(str(arrays[name]))
+        elif name == 'route_starts':
+            starts = arrays[name]
+            nodes = arrays['route_nodes']
+            instance['routes'] = [nodes[start:end] for start, end in zip(starts[:-1], starts[1:])]
+        elif name == 'cost':
+            instance[name] = float(arrays[name])
+        elif name != 'route_nodes':
+            instance[name] = arrays[name]
+    return instance
+
+
+def load_instance(file_name, use_cache=True, directory=DEFAULT_DIRECTORY):
+    # instance of the file read by the reader of its extension
+    # the result is kept in directory as a .npz file, keyed by the path, size and modification time of the file
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in READERS:
+        raise ValueError('no reader for %s files' % extension)
+    reader = READERS[extension]
+    if not use_cache:
+        return reader(file_name)
+    stat = os.stat(file_name)
+    key = '%s|%i|%i|%s' % (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns, reader.__name__)
+    name = os.path.splitext(os.path.basename(file_name))[0]
+    path = os.path.join(directory, '%s-%s.npz' % (name, hashlib.sha256(key.encode()).hexdigest()[:16]))
+    if os.path.exists(path):
+        with np.load(path) as arrays:
+            return from_arrays(arrays)
+    instance = reader(file_name)
+    os.makedirs(directory, exist_ok=True)
+    temp_path = '%s.%i.tmp.npz' % (path[:-4], os.getpid())
+    np.savez(temp_path, **to_arrays(instance))
+    os.replace(temp_path, path)
+    return instance
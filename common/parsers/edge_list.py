@@ -0,0 +1,22 @@
+import numpy as np
+
+from common.parsers.tsplib import CHUNK
+
+
+def read_edge_list(file_name, header_lines=1):
+    # 'i;j;c' lines after header_lines lines, one arc from node i to node j of cost c per line
+    # return {'tails', 'heads': node ids as written in the file, 'costs'}, CHUNK lines converted together
+    chunks = []
+    lines = []
+    with open(file_name, 'r') as f:
+        for number, line in enumerate(f):
+            if number < header_lines or not line.strip():
+                continue
+            lines.append(line)
+            if len(lines) == CHUNK:
+                chunks.append(np.array(' '.join(lines).replace(';', ' ').split(), dtype=np.float64).reshape(-1, 3))
+                lines = []
+    if lines:
+        chunks.append(np.array(' '.join(lines).replace(';', ' ').split(), dtype=np.float64).reshape(-1, 3))
+    arcs = np.concatenate(chunks) if chunks else np.zeros((0, 3))
+    return {'tails': arcs[:, 0].astype(np.int64), 'heads': arcs[:, 1].astype(np.int64), 'costs': arcs[:, 2]}
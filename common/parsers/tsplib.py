@@ -0,0 +1,125 @@
+import numpy as np
+
+CHUNK = 65536  # lines of a section converted to numbers together
+
+# sections ended by -1
+TERMINATED = ('DEPOT_SECTION', 'TOUR_SECTION')
+
+# EDGE_WEIGHT_FORMAT: (indices of the listed entries for n nodes, symmetric)
+WEIGHT_FORMATS = {
+    'FULL_MATRIX': (lambda n: np.indices((n, n)).reshape(2, -1), False),
+    'UPPER_ROW': (lambda n: np.triu_indices(n, 1), True),
+    'LOWER_COL': (lambda n: np.triu_indices(n, 1), True),
+    'LOWER_ROW': (lambda n: np.tril_indices(n, -1), True),
+    'UPPER_COL': (lambda n: np.tril_indices(n, -1), True),
+    'UPPER_DIAG_ROW': (lambda n: np.triu_indices(n), True),
+    'LOWER_DIAG_COL': (lambda n: np.triu_indices(n), True),
+    'LOWER_DIAG_ROW': (lambda n: np.tril_indices(n), True),
+    'UPPER_DIAG_COL': (lambda n: np.tril_indices(n), True),
+}
+
+
+def is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def read_section(f, terminated=False):
+    # numbers of the section starting at the current line of f, one line at a time, CHUNK lines converted together
+    # return (numbers, number of lines, first line after the section)
+    chunks = []
+    lines = []
+    count = 0
+    line = f.readline()
+    while line:
+        tokens = line.split()
+        if tokens:
+            if not is_number(tokens[0]):
+                break
+            if terminated and tokens[0] == '-1':
+                line = f.readline()
+                break
+            lines.append(line)
+            count += 1
+            if len(lines) == CHUNK:
+                chunks.append(np.array(' '.join(lines).split(), dtype=np.float64))
+                lines = []
+        line = f.readline()
+    if lines:
+        chunks.append(np.array(' '.join(lines).split(), dtype=np.float64))
+    return (np.concatenate(chunks) if chunks else np.zeros(0)), count, line
+
+
+def edge_weights(values, dimension, weight_format):
+    # full matrix of an EDGE_WEIGHT_SECTION
+    if weight_format not in WEIGHT_FORMATS:
+        raise ValueError('unsupported EDGE_WEIGHT_FORMAT %s' % weight_format)
+    indices, symmetric = WEIGHT_FORMATS[weight_format]
+    rows, cols = indices(dimension)
+    if len(values) != len(rows):
+        raise ValueError('EDGE_WEIGHT_SECTION has %i values, %s of %i nodes needs %i'
+                         % (len(values), weight_format, dimension, len(rows)))
+    matrix = np.zeros((dimension, dimension))
+    matrix[rows, cols] = values
+    if symmetric:
+        matrix[cols, rows] = values
+    return matrix
+
+
+def read_tsplib(file_name):
+    # TSPLIB / CVRPLIB file (.tsp, .vrp, .tour), read section by section
+    # return {'specification': {keyword: value}, and the arrays of the sections found:
+    #         'node_ids', 'coordinates' (n x 2 or n x 3), 'demands', 'depots', 'edge_weights' (n x n), 'tour'}
+    # the rows of coordinates and demands follow node_ids, the nodes of depots and tour are ids of the file
+    instance = {'specification': {}}
+    specification = instance['specification']
+    with open(file_name, 'r') as f:
+        line = f.readline()
+        while line:
+            text = line.strip()
+            if not text:
+                line = f.readline()
+                continue
+            keyword, _, value = text.partition(':')
+            keyword = keyword.strip().upper()
+            if keyword == 'EOF':
+                break
+            if not keyword.endswith('_SECTION'):
+                specification[keyword] = value.strip()
+                line = f.readline()
+                continue
+            values, count, line = read_section(f, keyword in TERMINATED)
+            if keyword == 'NODE_COORD_SECTION':
+                values = values.reshape(count, -1)
+                instance['node_ids'] = values[:, 0].astype(np.int64)
+                instance['coordinates'] = values[:, 1:]
+            elif keyword == 'DEMAND_SECTION':
+                values = values.reshape(count, -1)
+                instance['demands'] = values[:, 1].astype(np.int64)
+                instance.setdefault('node_ids', values[:, 0].astype(np.int64))
+            elif keyword == 'DEPOT_SECTION':
+                instance['depots'] = values.astype(np.int64)
+            elif keyword == 'TOUR_SECTION':
+                instance['tour'] = values.astype(np.int64)
+            elif keyword == 'EDGE_WEIGHT_SECTION':
+                instance['edge_weights'] = edge_weights(values, int(specification['DIMENSION']),
+                                                        specification.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX'))
+    return instance
+
+
+def read_routes(file_name):
+    # CVRPLIB solution (.opt, .sol): 'Route #1: 2 5 3' lines and a 'Cost 450' line
+    # return {'routes': [array of the nodes of every route, as written in the file], 'cost': float}
+    routes = []
+    cost = float('nan')
+    with open(file_name, 'r') as f:
+        for line in f:
+            text = line.strip()
+            if text.lower().startswith('route'):
+                routes.append(np.array(text.partition(':')[2].split(), dtype=np.int64))
+            elif text.lower().startswith('cost'):
+                cost = float(text.split()[1])
+    return {'routes': routes, 'cost': cost}
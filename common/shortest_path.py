@@ -0,0 +1,301 @@
+import heapq
+import time
+from collections import deque
+
+from common.parsers.cache import load_instance
+
+
+class IndexedGraph:
+    """Directed graph on nodes 0..num_node - 1 built from a dict {(i, j): cost}.
+
+    out_arcs[i] holds (j, cost) for every arc leaving i.
+    """
+
+    def __init__(self, edges, num_node=None):
+        if num_node is None:
+            num_node = max((max(i, j) for (i, j) in edges), default=-1) + 1
+        self.num_node = num_node
+        self.num_arc = len(edges)
+        self.out_arcs = [[] for _ in range(num_node)]
+        self.min_cost = 0
+        for (i, j), c in edges.items():
+            self.out_arcs[i].append((j, c))
+            self.min_cost = min(self.min_cost, c)
+
+    def has_negative_cost(self):
+        return self.min_cost < 0
+
+
+class ShortestPathResult:
+    def __init__(self, source, target, distance, predecessor, negative_cycle=None, iterations=0):
+        self.source = source
+        self.target = target
+        self.distance = distance  # distance[i]: cost of the best path found from source to i
+        self.predecessor = predecessor  # predecessor[i]: node before i on that path, -1 for none
+        self.negative_cycle = negative_cycle  # nodes of a negative cycle reachable from source, None if there is none
+        self.iterations = iterations  # labels taken from the queue
+
+    def cost(self):
+        return self.distance[self.target]
+
+    def path(self):
+        if self.negative_cycle is not None or self.distance[self.target] == float('inf'):
+            return None
+        path = [self.target]
+        while path[-1] != self.source:
+            path.append(self.predecessor[path[-1]])
+        path.reverse()
+        return path
+
+
+def find_cycle(predecessor, start):
+    # a cycle of the predecessor graph, looked for from start first and then from every node
+    # every such cycle of a label correcting algorithm has a negative cost
+    state = [0] * len(predecessor)  # 0: not seen, stamp of the walk which saw the node
+    for stamp, node in enumerate([start] + list(range(len(predecessor))), 1):
+        u = node
+        while u != -1 and state[u] == 0:
+            state[u] = stamp
+            u = predecessor[u]
+        if u != -1 and state[u] == stamp:
+            cycle = [u]
+            v = predecessor[u]
+            while v != u:
+                cycle.append(v)
+                v = predecessor[v]
+            cycle.reverse()
+            return cycle
+    return None
+
+
+def spfa(graph, source, target=None, removed_nodes=(), removed_arcs=None):
+    # Bellman-Ford with a FIFO queue of changed labels (SPFA)
+    # a node whose path from source has num_node arcs closes a negative cycle
+    # removed_nodes: set of nodes never entered, removed_arcs: {i: set of j} arcs (i, j) never used
+    removed_arcs = removed_arcs or {}
+    inf = float('inf')
+    distance = [inf] * graph.num_node
+    predecessor = [-1] * graph.num_node
+    length = [0] * graph.num_node  # number of arcs of the current path to the node
+    in_queue = [False] * graph.num_node
+    distance[source] = 0
+    queue = deque([source])
+    in_queue[source] = True
+    iterations = 0
+    while queue:
+        u = queue.popleft()
+        in_queue[u] = False
+        iterations += 1
+        du = distance[u]
+        removed = removed_arcs.get(u, ())
+        for v, c in graph.out_arcs[u]:
+            if du + c < distance[v] and v not in removed_nodes and v not in removed:
+                distance[v] = du + c
+                predecessor[v] = u
+                length[v] = length[u] + 1
+                if length[v] >= graph.num_node:
+                    cycle = find_cycle(predecessor, v)
+                    if cycle is not None:
+                        return ShortestPathResult(source, target, distance, predecessor, cycle, iterations)
+                if not in_queue[v]:
+                    in_queue[v] = True
+                    queue.append(v)
+    return ShortestPathResult(source, target, distance, predecessor, None, iterations)
+
+
+def dijkstra(graph, source, target=None, removed_nodes=(), removed_arcs=None):
+    # every cost must be non negative, stop as soon as target is settled
+    removed_arcs = removed_arcs or {}
+    inf = float('inf')
+    distance = [inf] * graph.num_node
+    predecessor = [-1] * graph.num_node
+    done = [False] * graph.num_node
+    distance[source] = 0
+    heap = [(0, source)]
+    iterations = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        iterations += 1
+        if u == target:
+            break
+        removed = removed_arcs.get(u, ())
+        for v, c in graph.out_arcs[u]:
+            if not done[v] and d + c < distance[v] and v not in removed_nodes and v not in removed:
+                distance[v] = d + c
+                predecessor[v] = u
+                heapq.heappush(heap, (distance[v], v))
+    return ShortestPathResult(source, target, distance, predecessor, None, iterations)
+
+
+def shortest_path(graph, source, target, removed_nodes=(), removed_arcs=None):
+    # Dijkstra when every cost is non negative, label correcting otherwise
+    if graph.has_negative_cost():
+        return spfa(graph, source, target, removed_nodes, removed_arcs)
+    return dijkstra(graph, source, target, removed_nodes, removed_arcs)
+
+
+def strongly_connected_components(graph):
+    # Kosaraju, iterative, component[i]: index of the component of node i
+    n = graph.num_node
+    order = []
+    seen = [False] * n
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(graph.out_arcs[root]))]
+        while stack:
+            u, arcs = stack[-1]
+            for v, _ in arcs:
+                if not seen[v]:
+                    seen[v] = True
+                    stack.append((v, iter(graph.out_arcs[v])))
+                    break
+            else:
+                stack.pop()
+                order.append(u)
+    in_arcs = [[] for _ in range(n)]
+    for u in range(n):
+        for v, _ in graph.out_arcs[u]:
+            in_arcs[v].append(u)
+    component = [-1] * n
+    count = 0
+    for root in reversed(order):
+        if component[root] != -1:
+            continue
+        component[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in in_arcs[u]:
+                if component[v] == -1:
+                    component[v] = count
+                    stack.append(v)
+        count += 1
+    return component
+
+
+def acyclic_subgraph(graph):
+    # arcs joining two strongly connected components only, this graph has no cycle
+    # these are also the only arcs a path may use under ordering rows y[j] >= y[i] + x[i, j] on every arc
+    component = strongly_connected_components(graph)
+    dag = IndexedGraph({}, graph.num_node)
+    for u in range(graph.num_node):
+        for v, c in graph.out_arcs[u]:
+            if component[u] != component[v]:
+                dag.out_arcs[u].append((v, c))
+                dag.num_arc += 1
+                dag.min_cost = min(dag.min_cost, c)
+    return dag
+
+
+def acyclic_path(graph, source, target):
+    # shortest path of the acyclic subgraph, simple and exact for it
+    result = shortest_path(acyclic_subgraph(graph), source, target)
+    return result.path(), result.cost()
+
+
+def k_shortest_paths(graph, source, target):
+    # Yen's algorithm, yield (cost, path) for the simple paths from source to target in cost order
+    # graph must not hold a negative cycle reachable from source, ValueError otherwise
+    result = shortest_path(graph, source, target)
+    if result.negative_cycle is not None:
+        raise ValueError('negative cycle reachable from node %i' % source)
+    path = result.path()
+    if path is None:
+        return
+    arc_cost = {}
+    for u in range(graph.num_node):
+        for v, c in graph.out_arcs[u]:
+            arc_cost[(u, v)] = c
+    found = [path]
+    candidates = []  # heap of (cost, path)
+    seen = {tuple(path)}
+    yield result.cost(), path
+    while True:
+        previous = found[-1]
+        root_cost = 0
+        for i in range(len(previous) - 1):
+            # the candidate leaves previous at its i-th node, on an arc no path found with the same root uses
+            root = previous[:i + 1]
+            spur = previous[i]
+            removed_arcs = {spur: {p[i + 1] for p in found if len(p) > i + 1 and p[:i + 1] == root}}
+            spur_result = shortest_path(graph, spur, target, set(root[:-1]), removed_arcs)
+            spur_path = spur_result.path()
+            if spur_path is not None:
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    heapq.heappush(candidates, (root_cost + spur_result.cost(), candidate))
+            root_cost += arc_cost[(previous[i], previous[i + 1])]
+        if not candidates:
+            return
+        cost, path = heapq.heappop(candidates)
+        found.append(path)
+        yield cost, path
+
+
+def build_arcs(edges):
+    # out_arcs[i] / in_arcs[i]: heads of the arcs leaving i / tails of the arcs entering i
+    nodes = set()
+    for (i, j) in edges:
+        nodes.add(i)
+        nodes.add(j)
+    num_node = max(nodes) + 1 if nodes else 0
+    out_arcs = [[] for _ in range(num_node)]
+    in_arcs = [[] for _ in range(num_node)]
+    for (i, j) in edges:
+        out_arcs[i].append(j)
+        in_arcs[j].append(i)
+    return out_arcs, in_arcs
+
+
+def read_data(file_name):
+    # edge list of the ShortestPath models, the nodes of the file are numbered from 1
+    arcs = load_instance(file_name)
+    tails = (arcs['tails'] - 1).tolist()
+    heads = (arcs['heads'] - 1).tolist()
+    data = dict()
+    data['V'] = set(tails) | set(heads)
+    data['E'] = dict(zip(zip(tails, heads), arcs['costs'].tolist()))
+    data['s'] = min(data['V'])
+    data['t'] = max(data['V'])
+    data['out'], data['in'] = build_arcs(data['E'])
+    return data
+
+
+def print_path(edges, title, path):
+    print(title)
+    print("Cost: %8.3f" % sum(edges[(u, v)] for u, v in zip(path, path[1:])))
+    print('Path: ' + ' -> '.join(str(u + 1) for u in path))
+    print("Edges:")
+    for u, v in zip(path, path[1:]):
+        print("\t%3d -> %3d: %6.3f" % (u + 1, v + 1, edges[(u, v)]))
+    print("_________________________________________________\n")
+
+
+def solve_native(edges, num_node, source, target):
+    # optimum of the ShortestPath models without building them, return the run time
+    # label correcting path when the graph has no negative cycle. Otherwise the y rows of the models forbid
+    # every arc on a cycle, and their optimum is the shortest path of the arcs on no cycle
+    start_time = time.time()
+    graph = IndexedGraph(edges, num_node)
+    result = shortest_path(graph, source, target)
+    if result.negative_cycle is None:
+        title = "Label correcting solution:"
+        path = result.path()
+    else:
+        cycle = result.negative_cycle + result.negative_cycle[:1]
+        print("Negative cycle: " + ' -> '.join(str(u + 1) for u in cycle))
+        title = "Acyclic subgraph solution:"
+        path, _ = acyclic_path(graph, source, target)
+    native_time = time.time() - start_time
+    if path is None:
+        print("cannot solve")
+    else:
+        print_path(edges, title, path)
+    print("Native time: %f s" % native_time)
+    return native_time
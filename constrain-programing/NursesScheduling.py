@@ -1,6 +1,18 @@
 """Example of a simple nurse scheduling problem."""
+import os
+import sys
+import time
+
+import numpy as np
 from ortools.sat.python import cp_model
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_cache import CP, ModelCache
+
+# Solution files: header of 3 int32 (num_nurses, num_days, num_shifts), then one record per solution,
+# the shifts[(n, d, s)] values in (n, d, s) order packed 8 per byte by np.packbits.
+HEADER = np.dtype(np.int32)
+
 
 class NursesPartialSolutionPrinter(cp_model.CpSolverSolutionCallback):
     """ Print intermediate solutions. """
@@ -27,7 +39,7 @@ class NursesPartialSolutionPrinter(cp_model.CpSolverSolutionCallback):
                         print('  Nurse %i works shift %i' % (n, s))
                 if not is_working:
                     print('  Nurse {} does not work'.format(n))
-        if self._solution_count >= self._solution_limit:
+        if self._solution_limit is not None and self._solution_count >= self._solution_limit:
             print('Stop search after %i solutions' % self._solution_limit)
             self.StopSearch()
 
@@ -35,12 +47,68 @@ class NursesPartialSolutionPrinter(cp_model.CpSolverSolutionCallback):
         return self._solution_count
 
 
+class NursesSolutionCounter(cp_model.CpSolverSolutionCallback):
+    """ Count the solutions, no value is read. """
+
+    def __init__(self, limit=None):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self._solution_count = 0
+        self._solution_limit = limit
+
+    def on_solution_callback(self):
+        self._solution_count += 1
+        if self._solution_limit is not None and self._solution_count >= self._solution_limit:
+            self.StopSearch()
+
+    def solution_count(self):
+        return self._solution_count
+
+
+class NursesSolutionSink(cp_model.CpSolverSolutionCallback):
+    """ Send every solution to sink as packed bits, all values are read at once from the response. """
+
+    def __init__(self, shifts, num_nurses, num_days, num_shifts, sink, limit=None):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self._indices = np.array([shifts[(n, d, s)].Index() for n in range(num_nurses) for d in range(num_days)
+                                  for s in range(num_shifts)], dtype=np.int64)
+        self._sink = sink  # called with the bytes of every solution
+        self._solution_count = 0
+        self._solution_limit = limit
+
+    def on_solution_callback(self):
+        self._solution_count += 1
+        values = np.array(self.Response().solution, dtype=np.uint8)
+        self._sink(np.packbits(values[self._indices]).tobytes())
+        if self._solution_limit is not None and self._solution_count >= self._solution_limit:
+            self.StopSearch()
+
+    def solution_count(self):
+        return self._solution_count
+
+
+def read_solutions(file_path):
+    # generator of the solutions of a solution file, bool arrays of shape (num_nurses, num_days, num_shifts)
+    with open(file_path, 'rb') as f:
+        shape = tuple(np.frombuffer(f.read(3 * HEADER.itemsize), dtype=HEADER))
+        size = int(np.prod(shape))
+        record = (size + 7) // 8
+        while True:
+            data = f.read(record)
+            if len(data) < record:
+                break
+            yield np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=size).reshape(shape).astype(bool)
+
+
 class NurseScheduling:
-    def __init__(self, num_nurses=4, num_shifts=3, num_days=3, solution_limit=5):
+    def __init__(self, num_nurses=4, num_shifts=3, num_days=3, solution_limit=5, mode='print', output_path=None,
+                 sink=None, cache=None):
         self.num_nurses = num_nurses
         self.num_shifts = num_shifts
         self.num_days = num_days
-        self.solution_limit = solution_limit
+        self.solution_limit = solution_limit  # None for every solution
+        self.mode = mode  # 'print', 'count': count only, 'sink': packed solutions to output_path or sink
+        self.output_path = output_path  # solution file of the 'sink' mode
+        self.sink = sink  # called with the bytes of every solution in 'sink' mode, when there is no output_path
         self.all_nurses = range(self.num_nurses)
         self.all_shifts = range(self.num_shifts)
         self.all_days = range(self.num_days)
@@ -48,10 +116,31 @@ class NurseScheduling:
         self.shifts = {}  # cp_model.NewBoolVar: var in model
         self.solver = None  # cp_model.Solver
         self.solution_printer = None  # Call back class return result from solver
+        self.cache = cache  # ModelCache, None to build the model every time
+        self.build_time = 0
+        self.solve_time = 0
 
     def create_model(self):
         self.model = cp_model.CpModel()
 
+    def build_model(self):
+        # create_model, create_var and add_constrain, the proto is loaded from the cache when it was built before
+        start_time = time.time()
+        self.create_model()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(CP, self, self.num_nurses, self.num_shifts, self.num_days)
+            variables = self.cache.load_cp(key, self.model)
+            if variables is not None:
+                self.shifts = variables['shifts']
+                self.build_time = time.time() - start_time
+                return
+        self.create_var()
+        self.add_constrain()
+        self.build_time = time.time() - start_time
+        if key is not None:
+            self.cache.store_cp(key, self.model, {'shifts': self.shifts}, self.build_time)
+
     def create_var(self):
         # Creates shift variables.
         # shifts[(n, d, s)]: nurse 'n' works shift 's' on day 'd'.
@@ -94,18 +183,34 @@ class NurseScheduling:
         self.solver = cp_model.CpSolver()
 
     def solve(self):
-        self.create_model()
-        self.create_var()
-        self.add_constrain()
+        self.build_model()
         self.create_solver()
         self.solver.parameters.linearization_level = 0
         # Enumerate all solutions.
         self.solver.parameters.enumerate_all_solutions = True
-        # Display the first five solutions.
-        self.solution_printer = NursesPartialSolutionPrinter(self.shifts, self.num_nurses,
-                                                             self.num_days, self.num_shifts,
-                                                             self.solution_limit)
+        start_time = time.time()
+        if self.mode == 'count':
+            self.solution_printer = NursesSolutionCounter(self.solution_limit)
+            self.solver.Solve(self.model, self.solution_printer)
+        elif self.mode == 'sink':
+            if self.output_path is None:
+                self.solve_to_sink(self.sink)
+            else:
+                with open(self.output_path, 'wb') as f:
+                    f.write(np.array([self.num_nurses, self.num_days, self.num_shifts], dtype=HEADER).tobytes())
+                    self.solve_to_sink(f.write)
+        else:
+            # Display the first five solutions.
+            self.solution_printer = NursesPartialSolutionPrinter(self.shifts, self.num_nurses,
+                                                                 self.num_days, self.num_shifts,
+                                                                 self.solution_limit)
+
+            self.solver.Solve(self.model, self.solution_printer)
+        self.solve_time = time.time() - start_time
 
+    def solve_to_sink(self, sink):
+        self.solution_printer = NursesSolutionSink(self.shifts, self.num_nurses, self.num_days, self.num_shifts,
+                                                   sink, self.solution_limit)
         self.solver.Solve(self.model, self.solution_printer)
 
     def print_result(self):
@@ -114,13 +219,17 @@ class NurseScheduling:
         print('  - conflicts      : %i' % self.solver.NumConflicts())
         print('  - branches       : %i' % self.solver.NumBranches())
         print('  - wall time      : %f s' % self.solver.WallTime())
+        print('  - build time     : %f s' % self.build_time)
+        print('  - solve time     : %f s' % self.solve_time)
         print('  - solutions found: %i' % self.solution_printer.solution_count())
 
 
 def main():
     # Creates the model.
-    nurse_scheduler = NurseScheduling()
+    cache = ModelCache()
+    nurse_scheduler = NurseScheduling(cache=cache)
     nurse_scheduler.solve()
+    cache.print_stats()
 
 
 if __name__ == '__main__':
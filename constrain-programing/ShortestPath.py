@@ -1,5 +1,15 @@
+import itertools
+import os
+import sys
+import time
+
 from ortools.sat.python import cp_model
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_cache import CP
+from common.shortest_path import (IndexedGraph, acyclic_subgraph, build_arcs, k_shortest_paths, print_path, read_data,
+                                  shortest_path, solve_native)
+
 
 class ShortestPathPartialSolutionPrinter(cp_model.CpSolverSolutionCallback):
     """Print intermediate solutions."""
@@ -48,11 +58,22 @@ class ShortestPathPartialSolutionPrinter(cp_model.CpSolverSolutionCallback):
 
 
 class ShortestPath:
-    def __init__(self, edges=None, v=None, start=1, end=1, solution_limit=5):
+    def __init__(self, edges=None, v=None, start=1, end=1, solution_limit=5, out_arcs=None, in_arcs=None,
+                 use_native=True, enumeration='yen', cache=None):
         self.start = start
         self.end = end
         self.num_node = len(v)
         self.edges = edges
+        if out_arcs is None or in_arcs is None:
+            out_arcs, in_arcs = build_arcs(edges)
+        self.out_arcs = out_arcs  # out_arcs[i]: nodes j with an arc (i, j)
+        self.in_arcs = in_arcs  # in_arcs[i]: nodes j with an arc (j, i)
+        self.enumeration = enumeration  # 'yen': the solution_limit cheapest paths, 'cp': CP-SAT enumeration
+        self.use_native = use_native  # solve with the label correcting engine instead of the model
+        self.cache = cache  # ModelCache, None to build the model every time
+        self.native_time = 0
+        self.build_time = 0
+        self.solve_time = 0
         self.all_node = v
         self.nodes_var = {}  # IntVar: var in solver
         self.solver = None
@@ -64,6 +85,22 @@ class ShortestPath:
     def create_model(self):
         self.model = cp_model.CpModel()
 
+    def build_model(self):
+        # create_model, create_var and add_constrain, the proto is loaded from the cache when it was built before
+        self.create_model()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(CP, self, self.edges, self.start, self.end, self.num_node)
+            variables = self.cache.load_cp(key, self.model)
+            if variables is not None:
+                self.nodes_var = variables['nodes_var']
+                return
+        start_time = time.time()
+        self.create_var()
+        self.add_constrain()
+        if key is not None:
+            self.cache.store_cp(key, self.model, {'nodes_var': self.nodes_var}, time.time() - start_time)
+
     def create_var(self):
         # Creates variables.
         for (s, t) in self.edges:
@@ -72,18 +109,20 @@ class ShortestPath:
             self.nodes_var[i] = self.model.NewIntVar(0, self.num_node, "y[%i]" % i)
 
     def add_constrain(self):
+        # flow conservation, every row is built from the arc lists of its node
         for i in range(self.num_node):
+            out_flow = cp_model.LinearExpr.Sum([self.nodes_var[(i, j)] for j in self.out_arcs[i]])
+            in_flow = cp_model.LinearExpr.Sum([self.nodes_var[(j, i)] for j in self.in_arcs[i]])
             if i == self.start:
-                self.model.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) == 1)
-                self.model.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 0)
+                self.model.Add(out_flow == 1)
+                self.model.Add(in_flow == 0)
             elif i == self.end:
-                self.model.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) == 0)
-                self.model.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 1)
+                self.model.Add(out_flow == 0)
+                self.model.Add(in_flow == 1)
             else:
-                self.model.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) - sum(
-                    self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 0)
-                self.model.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) <= 1)
-                self.model.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) <= 1)
+                self.model.Add(out_flow - in_flow == 0)
+                self.model.Add(out_flow <= 1)
+                self.model.Add(in_flow <= 1)
 
         for (s, t) in self.edges:
             self.model.Add(self.nodes_var[t] - self.nodes_var[s] - self.nodes_var[(s, t)] >= 0)
@@ -93,9 +132,15 @@ class ShortestPath:
         self.solver = cp_model.CpSolver()
 
     def solve(self):
-        self.create_model()
-        self.create_var()
-        self.add_constrain()
+        if self.enumeration == 'yen':
+            self.solve_k_paths()
+            return
+        if self.use_native:
+            self.native_time = solve_native(self.edges, len(self.out_arcs), self.start, self.end)
+            return
+        start_time = time.time()
+        self.build_model()
+        self.build_time = time.time() - start_time
         self.create_solver()
         self.solver.parameters.linearization_level = 0
         # Enumerate all solutions.
@@ -104,40 +149,49 @@ class ShortestPath:
         self.solution_printer = ShortestPathPartialSolutionPrinter(self.edges, self.nodes_var, self.num_node,
                                                                    self.solution_limit, self.start, self.end)
 
+        start_time = time.time()
         self.solver.Solve(self.model, self.solution_printer)
+        self.solve_time = time.time() - start_time
         self.print_result()
 
+    def k_paths(self):
+        # generator of (cost, path) in cost order
+        # with a negative cycle only the arcs the y rows of the model allow are kept, the paths have no cycle
+        graph = IndexedGraph(self.edges, len(self.out_arcs))
+        if shortest_path(graph, self.start, self.end).negative_cycle is not None:
+            graph = acyclic_subgraph(graph)
+        return k_shortest_paths(graph, self.start, self.end)
+
+    def solve_k_paths(self):
+        start_time = time.time()
+        count = 0
+        for cost, path in itertools.islice(self.k_paths(), self.solution_limit):
+            count += 1
+            print_path(self.edges, 'Solution %i' % count, path)
+        self.solve_time = time.time() - start_time
+        print('\nStatistics')
+        print('  - solve time     : %f s' % self.solve_time)
+        print('  - solutions found: %i' % count)
+
     def print_result(self):
         # Statistics.
         print('\nStatistics')
         print('  - conflicts      : %i' % self.solver.NumConflicts())
         print('  - branches       : %i' % self.solver.NumBranches())
         print('  - wall time      : %f s' % self.solver.WallTime())
+        print('  - native time    : %f s' % self.native_time)
+        print('  - build time     : %f s' % self.build_time)
+        print('  - solve time     : %f s' % self.solve_time)
         print('  - solutions found: %i' % self.solution_printer.solution_count())
 
 
-def read_data(file_name):
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
-    data = dict()
-    data['V'] = set()
-    data['E'] = dict()
-    for line in lines[1:]:
-        i, j, c = line.split(';')
-        data['V'].add(int(i) - 1)
-        data['V'].add(int(j) - 1)
-        data['E'][int(i) - 1, int(j) - 1] = float(c)
-    data['s'] = min(data['V'])
-    data['t'] = max(data['V'])
-    return data
-
-
 def main():
     path = "../data/Bai1_25_l_1.txt"
     # path = input("path to file: ")
     data = read_data(path)
     # Creates the solver.
-    shortest_path = ShortestPath(edges=data["E"], v=data["V"], start=data["s"], end=data["t"])
+    shortest_path = ShortestPath(edges=data["E"], v=data["V"], start=data["s"], end=data["t"],
+                                 out_arcs=data["out"], in_arcs=data["in"])
     shortest_path.solve()
 
 
@@ -1,79 +1,153 @@
+import math
+
 from ortools.sat.python import cp_model
 
+from sudoku_propagation import BUDGET, BitmaskSudoku
+
+# CP-SAT parameters, 'large' for the 16x16 grids and more
+SOLVER_PROFILES = {
+    'default': {},
+    'single': {'num_workers': 1},
+    'large': {'num_workers': 8, 'cp_model_presolve': True, 'linearization_level': 0},
+    'no_presolve': {'num_workers': 8, 'cp_model_presolve': False, 'linearization_level': 0},
+}
+
 def displaySudoku(sudoku):
     for row in sudoku:
         for col in row:
             print(col, end= " ")
         print("\n")
 
-def initialSudoku():
+def initialSudoku(size=9):
     sudoku = []
     print("input sudoku matrix")
-    for i in range(9):
+    for i in range(size):
         row = input("")
         sudoku.append(row.split(" "))
     
-    for i in range(9):
-        for j in range(9):
+    for i in range(size):
+        for j in range(size):
             sudoku[i][j] = int(sudoku[i][j])
     return sudoku
 
 def initialModel(model, sudoku):
-    sudoku_init = [[0 for i in range(9)] for j in range(9)]
-    for i in range(9):
-        for j in range(9):
+    size = len(sudoku)
+    sudoku_init = [[0 for i in range(size)] for j in range(size)]
+    for i in range(size):
+        for j in range(size):
             if sudoku[i][j] != 0:
                 sudoku_init[i][j] = model.NewIntVar(sudoku[i][j], sudoku[i][j], 'row: %i' %i)
             else:
-                sudoku_init[i][j] = model.NewIntVar(1, 9, 'row: %i' %i)
+                sudoku_init[i][j] = model.NewIntVar(1, size, 'row: %i' %i)
     return sudoku_init
 
-def solveSudoku(sudoku):
+def addBooleanChanneling(model, x):
+    # b[i][j][v] is true when cell (i, j) holds v + 1, exactly one cell of every unit holds every value
+    size = len(x)
+    box = math.isqrt(size)
+    b = [[[model.NewBoolVar('b[%i][%i][%i]' % (i, j, v)) for v in range(size)] for j in range(size)]
+         for i in range(size)]
+    for i in range(size):
+        for j in range(size):
+            model.AddExactlyOne(b[i][j])
+            model.Add(x[i][j] == sum((v + 1) * b[i][j][v] for v in range(size)))
+    for v in range(size):
+        for i in range(size):
+            model.AddExactlyOne([b[i][j][v] for j in range(size)])
+        for j in range(size):
+            model.AddExactlyOne([b[i][j][v] for i in range(size)])
+        for row_idx in range(0, size, box):
+            for col_idx in range(0, size, box):
+                model.AddExactlyOne([b[row_idx + i][col_idx + j][v] for i in range(box) for j in range(box)])
+    return b
+
+def setProfile(solver, profile):
+    for name, value in SOLVER_PROFILES[profile].items():
+        setattr(solver.parameters, name, value)
+
+def printSolution(solution):
+    print("==================")
+    for row in solution:
+        for value in row:
+            print(value, end=" ")
+        print()
+
+def solveSudoku(sudoku, node_budget=1000, profile='default', channeling=False, time_limit=None, verbose=True):
+    # bitmask propagation first, the CP-SAT model only when its search is over node_budget
+    # the model then starts from the cells fixed by the propagation, node_budget None for the model only
+    # return the solved grid, None when there is no solution or none is found within time_limit seconds
+    size = len(sudoku)
+    box = math.isqrt(size)
+    if node_budget is not None:
+        propagation = BitmaskSudoku(node_budget, box)
+        solution, path = propagation.solve_grid([v for row in sudoku for v in row])
+        if path != BUDGET:
+            if solution is not None:
+                solution = [solution[i * size:(i + 1) * size] for i in range(size)]
+            if verbose:
+                if solution is None:
+                    print("==================")
+                    print("Unfeasible Sudoku")
+                else:
+                    printSolution(solution)
+                print("Solved by " + path)
+            return solution
+        sudoku = [propagation.propagated[i * size:(i + 1) * size] for i in range(size)]
+
     model = cp_model.CpModel()
     x = initialModel(model, sudoku)
 
     # different in row
-    for i in range(9):
-        model.AddAllDifferent([x[i][j] for j in range(9)])
+    for i in range(size):
+        model.AddAllDifferent([x[i][j] for j in range(size)])
 
     #   different in column
-    for j in range(9):
-        model.AddAllDifferent([x[i][j] for i in range(9)])
+    for j in range(size):
+        model.AddAllDifferent([x[i][j] for i in range(size)])
 
     # Constraint in sector
-    for row_idx in range(0, 9, 3):
-        for col_idx in range(0, 9, 3):
-            model.AddAllDifferent([x[row_idx + i][j] for j in range(col_idx, (col_idx + 3)) for i in range(3)])
+    for row_idx in range(0, size, box):
+        for col_idx in range(0, size, box):
+            model.AddAllDifferent([x[row_idx + i][j] for j in range(col_idx, (col_idx + box)) for i in range(box)])
+
+    if channeling:
+        addBooleanChanneling(model, x)
     
     solver = cp_model.CpSolver()
+    setProfile(solver, profile)
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
 
     # Solving
     status = solver.Solve(model)
 
-    print("==================")
+    solution = None
     if status == cp_model.FEASIBLE or status == cp_model.OPTIMAL:
-        for i in range(9):
-            for j in range(9):
-                print(solver.Value(x[i][j]), end=" ")
-            print()
-    else:
-        print("Unfeasible Sudoku")
+        solution = [[solver.Value(x[i][j]) for j in range(size)] for i in range(size)]
+    if verbose:
+        if solution is None:
+            print("==================")
+            print("Unfeasible Sudoku")
+        else:
+            printSolution(solution)
+    return solution
 
     
 
-sudoku_to_solve = [[0, 0, 7, 5, 0, 0, 6, 0, 3],
-                               [4, 3, 0, 0, 0, 6, 0, 0, 5],
-                               [6, 0, 8, 1, 0, 9, 0, 2, 7],
-                               [2, 0, 6, 4, 5, 0, 0, 0, 0],
-                               [0, 0, 1, 0, 6, 0, 3, 4, 0],
-                               [7, 0, 0, 0, 0, 8, 0, 5, 0],
-                               [8, 0, 0, 7, 0, 0, 1, 3, 0],
-                               [0, 7, 4, 0, 2, 0, 5, 9, 0],
-                               [1, 0, 9, 3, 0, 5, 0, 0, 0]]
-
-displaySudoku(sudoku_to_solve)
-print("==================")
-solveSudoku(sudoku_to_solve)
-
-# sudoku = initialSudoku()
-# solveSudoku(sudoku)
\ No newline at end of file
+if __name__ == '__main__':
+    sudoku_to_solve = [[0, 0, 7, 5, 0, 0, 6, 0, 3],
+                                   [4, 3, 0, 0, 0, 6, 0, 0, 5],
+                                   [6, 0, 8, 1, 0, 9, 0, 2, 7],
+                                   [2, 0, 6, 4, 5, 0, 0, 0, 0],
+                                   [0, 0, 1, 0, 6, 0, 3, 4, 0],
+                                   [7, 0, 0, 0, 0, 8, 0, 5, 0],
+                                   [8, 0, 0, 7, 0, 0, 1, 3, 0],
+                                   [0, 7, 4, 0, 2, 0, 5, 9, 0],
+                                   [1, 0, 9, 3, 0, 5, 0, 0, 0]]
+
+    displaySudoku(sudoku_to_solve)
+    print("==================")
+    solveSudoku(sudoku_to_solve)
+
+    # sudoku = initialSudoku()
+    # solveSudoku(sudoku)
\ No newline at end of file
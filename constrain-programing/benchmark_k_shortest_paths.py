@@ -0,0 +1,64 @@
+import itertools
+import time
+
+from ortools.sat.python import cp_model
+
+from ShortestPath import ShortestPath, read_data
+
+
+class DistinctPathCounter(cp_model.CpSolverSolutionCallback):
+    # stop after k distinct paths, the y values give many solutions for one path
+
+    def __init__(self, arcs, k):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.arcs = arcs  # {(i, j): var}
+        self.k = k
+        self.paths = set()
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        self.paths.add(frozenset(arc for arc, var in self.arcs.items() if self.Value(var) == 1))
+        if len(self.paths) >= self.k:
+            self.StopSearch()
+
+
+def path_cost(edges, arcs):
+    return sum(edges[arc] for arc in arcs)
+
+
+def benchmark(files, k=10, time_limit=60):
+    # time to k paths: Yen's generator against the CP-SAT enumeration of ShortestPath
+    print('  %-22s %6s %10s %12s %10s %12s %12s' % ('file', 'mode', 'paths', 'solutions', 'time (s)',
+                                                    'best cost', 'worst cost'))
+    for file_path in files:
+        data = read_data(file_path)
+        shortest_path = ShortestPath(edges=data["E"], v=data["V"], start=data["s"], end=data["t"],
+                                     out_arcs=data["out"], in_arcs=data["in"], use_native=False)
+
+        start_time = time.time()
+        costs = [cost for cost, _ in itertools.islice(shortest_path.k_paths(), k)]
+        yen_time = time.time() - start_time
+        name = file_path.split('/')[-1]
+        print('  %-22s %6s %10i %12i %10.4f %12.2f %12.2f' % (name, 'yen', len(costs), len(costs), yen_time,
+                                                            min(costs, default=0), max(costs, default=0)))
+
+        start_time = time.time()
+        shortest_path.create_model()
+        shortest_path.create_var()
+        shortest_path.add_constrain()
+        shortest_path.create_solver()
+        shortest_path.solver.parameters.linearization_level = 0
+        shortest_path.solver.parameters.enumerate_all_solutions = True
+        shortest_path.solver.parameters.max_time_in_seconds = time_limit
+        arcs = {arc: shortest_path.nodes_var[arc] for arc in shortest_path.edges}
+        counter = DistinctPathCounter(arcs, k)
+        shortest_path.solver.Solve(shortest_path.model, counter)
+        cp_time = time.time() - start_time
+        costs = [path_cost(shortest_path.edges, path) for path in counter.paths]
+        print('  %-22s %6s %10i %12i %10.4f %12.2f %12.2f' % (name, 'cp-sat', len(costs), counter.solution_count,
+                                                            cp_time, min(costs, default=0), max(costs, default=0)))
+
+
+if __name__ == '__main__':
+    benchmark(['../data/Bai1_25_l_1.txt', '../data/Bai1_50_l_1.txt', '../data/Bai1_100_l_1.txt'])
@@ -0,0 +1,47 @@
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from NursesScheduling import NurseScheduling
+from nurses_rolling_horizon import RollingHorizonNurseScheduling
+
+
+def solve_monolithic(num_nurses, num_shifts, num_days, time_limit):
+    # first solution of the NurseScheduling model, return (shifts per nurse or None, seconds)
+    start_time = time.time()
+    nurse_scheduler = NurseScheduling(num_nurses=num_nurses, num_shifts=num_shifts, num_days=num_days)
+    nurse_scheduler.create_model()
+    nurse_scheduler.create_var()
+    nurse_scheduler.add_constrain()
+    nurse_scheduler.create_solver()
+    nurse_scheduler.solver.parameters.max_time_in_seconds = time_limit
+    status = nurse_scheduler.solver.Solve(nurse_scheduler.model)
+    if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+        return None, time.time() - start_time
+    worked = np.zeros(num_nurses, dtype=np.int64)
+    for (n, d, s), var in nurse_scheduler.shifts.items():
+        worked[n] += nurse_scheduler.solver.BooleanValue(var)
+    return worked, time.time() - start_time
+
+
+def benchmark(num_nurses=100, num_shifts=30, horizons=(7, 14, 28, 56, 84), time_limit=120):
+    # wall time and shifts per nurse of the monolithic model and of the rolling horizon
+    print('%i nurses, %i shifts a day' % (num_nurses, num_shifts))
+    print('  %-6s %-10s %10s %10s %14s' % ('days', 'mode', 'time (s)', 'solved', 'shifts / nurse'))
+    for num_days in horizons:
+        worked, seconds = solve_monolithic(num_nurses, num_shifts, num_days, time_limit)
+        spread = '-' if worked is None else '%i - %i' % (worked.min(), worked.max())
+        print('  %-6i %-10s %10.2f %10s %14s' % (num_days, 'monolithic', seconds, worked is not None, spread))
+
+        rolling = RollingHorizonNurseScheduling(num_nurses=num_nurses, num_shifts=num_shifts, num_days=num_days,
+                                                time_limit=time_limit)
+        rolling.solve()
+        worked = rolling.shifts_per_nurse()
+        spread = '-' if not rolling.feasible else '%i - %i' % (worked.min(), worked.max())
+        print('  %-6i %-10s %10.2f %10s %14s' % (num_days, 'rolling', rolling.wall_time, rolling.is_balanced(),
+                                                 spread))
+
+
+if __name__ == '__main__':
+    benchmark()
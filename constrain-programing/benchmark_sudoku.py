@@ -0,0 +1,60 @@
+import random
+import time
+
+from Sudoku import solveSudoku
+
+# (name, solveSudoku keyword arguments)
+CONFIGURATIONS = [
+    ('propagation', {'node_budget': 1000}),
+    ('cp default', {'node_budget': None}),
+    ('cp large', {'node_budget': None, 'profile': 'large'}),
+    ('cp no presolve', {'node_budget': None, 'profile': 'no_presolve'}),
+    ('cp large + bool', {'node_budget': None, 'profile': 'large', 'channeling': True}),
+    ('pre-pass + cp', {'node_budget': 0}),
+    ('pre-pass + cp + bool', {'node_budget': 0, 'channeling': True}),
+]
+
+
+def generate_puzzle(box, empty_ratio=0.6, seed=0):
+    # shuffled pattern solution, then empty_ratio of the cells are emptied, the solution may not be unique
+    rng = random.Random(seed)
+    size = box * box
+    bands = rng.sample(range(box), box)
+    rows = [b * box + r for b in bands for r in rng.sample(range(box), box)]
+    stacks = rng.sample(range(box), box)
+    cols = [s * box + c for s in stacks for c in rng.sample(range(box), box)]
+    values = rng.sample(range(1, size + 1), size)
+    grid = [[values[(box * (r % box) + r // box + c) % size] for c in cols] for r in rows]
+    for i in rng.sample(range(size * size), int(empty_ratio * size * size)):
+        grid[i // size][i % size] = 0
+    return grid
+
+
+def is_solution(puzzle, solution):
+    size = len(puzzle)
+    box = int(size ** 0.5)
+    units = [[(i, j) for j in range(size)] for i in range(size)] + [[(i, j) for i in range(size)] for j in range(size)]
+    units += [[(r + i, c + j) for i in range(box) for j in range(box)]
+              for r in range(0, size, box) for c in range(0, size, box)]
+    return (all(puzzle[i][j] in (0, solution[i][j]) for i in range(size) for j in range(size)) and
+            all(sorted(solution[i][j] for i, j in unit) == list(range(1, size + 1)) for unit in units))
+
+
+def benchmark(boxes=(3, 4, 5, 6), puzzles=2, empty_ratio=0.6, time_limit=60):
+    # mean solve time of every configuration for every grid size, CP-SAT stops after time_limit seconds
+    print('  %-8s %-22s %12s %8s' % ('grid', 'configuration', 'time (s)', 'solved'))
+    for box in boxes:
+        size = box * box
+        grids = [generate_puzzle(box, empty_ratio, seed) for seed in range(puzzles)]
+        for name, arguments in CONFIGURATIONS:
+            start_time = time.time()
+            solved = 0
+            for grid in grids:
+                solution = solveSudoku(grid, time_limit=time_limit, verbose=False, **arguments)
+                solved += solution is not None and is_solution(grid, solution)
+            print('  %-8s %-22s %12.4f %8i' % ('%ix%i' % (size, size), name, (time.time() - start_time) / puzzles,
+                                                solved))
+
+
+if __name__ == '__main__':
+    benchmark()
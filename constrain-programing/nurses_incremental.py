@@ -0,0 +1,210 @@
+"""Nurse scheduling re-solved in place when the availability of the nurses changes."""
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+class IncrementalNurseScheduler:
+    """ NurseScheduling model built once for max_nurses nurses, then changed by deltas.
+
+    Deltas only rewrite the bounds of the model proto: the domain of a shift variable to make a nurse
+    unavailable or to fix an assignment, the domain of the balance row of a nurse to add or remove the nurse.
+    Nurses outside the roster keep every shift variable at 0. After the first solve, every solve starts
+    from the previous roster as hint and minimizes the number of shift variables changed.
+    """
+
+    def __init__(self, num_nurses=4, num_shifts=3, num_days=3, max_nurses=None, time_limit=0.8, num_workers=0):
+        self.num_shifts = num_shifts
+        self.num_days = num_days
+        self.max_nurses = max(max_nurses or num_nurses, num_nurses)  # nurses the model is built for
+        self.time_limit = time_limit  # seconds per solve
+        self.active = [n < num_nurses for n in range(self.max_nurses)]  # nurses of the roster
+        self.all_shifts = range(self.num_shifts)
+        self.all_days = range(self.num_days)
+        self.unavailable = set()  # (n, d)
+        self.fixed = set()  # (n, d, s)
+        self.model = None  # cp_model.CPModel: Model of problem
+        self.shifts = {}  # cp_model.NewBoolVar: var in model
+        self.balance = {}  # n: index of the balance row of nurse n in the model proto
+        self.min_shifts_per_nurse = 0
+        self.max_shifts_per_nurse = 0
+        self.solver = cp_model.CpSolver()
+        self.solver.parameters.max_time_in_seconds = time_limit
+        if num_workers:
+            self.solver.parameters.num_workers = num_workers
+        self.roster = None  # roster[n, d]: shift of nurse n on day d, -1 for none
+        self.status = None
+        self.changes = 0  # (nurse, day) whose shift changed in the last solve
+        self.build_time = 0
+        self.solve_time = 0
+        self.build()
+
+    def build(self):
+        start_time = time.time()
+        self.model = cp_model.CpModel()
+        for n in range(self.max_nurses):
+            for d in self.all_days:
+                for s in self.all_shifts:
+                    self.shifts[(n, d, s)] = self.model.NewBoolVar('shift_n%id%is%i' % (n, d, s))
+        # Each shift is assigned to exactly one nurse in the schedule period.
+        for d in self.all_days:
+            for s in self.all_shifts:
+                self.model.AddExactlyOne(self.shifts[(n, d, s)] for n in range(self.max_nurses))
+        # Each nurse works at most one shift per day.
+        for n in range(self.max_nurses):
+            for d in self.all_days:
+                self.model.AddAtMostOne(self.shifts[(n, d, s)] for s in self.all_shifts)
+        # Balance, the bounds are set by update_balance
+        for n in range(self.max_nurses):
+            worked = sum(self.shifts[(n, d, s)] for d in self.all_days for s in self.all_shifts)
+            self.balance[n] = self.model.AddLinearConstraint(worked, 0, 0).Index()
+        self.update_balance()
+        self.build_time = time.time() - start_time
+
+    def update_balance(self):
+        num_nurses = sum(self.active)
+        self.min_shifts_per_nurse = (self.num_shifts * self.num_days) // num_nurses
+        self.max_shifts_per_nurse = -(-(self.num_shifts * self.num_days) // num_nurses)
+        constraints = self.model.Proto().constraints
+        for n in range(self.max_nurses):
+            domain = constraints[self.balance[n]].linear.domain
+            domain[0] = self.min_shifts_per_nurse if self.active[n] else 0
+            domain[1] = self.max_shifts_per_nurse if self.active[n] else 0
+
+    def set_domain(self, n, d, s):
+        # domain of shifts[(n, d, s)] from the deltas
+        domain = self.model.Proto().variables[self.shifts[(n, d, s)].Index()].domain
+        if (n, d, s) in self.fixed:
+            domain[0], domain[1] = 1, 1
+        elif (n, d) in self.unavailable:
+            domain[0], domain[1] = 0, 0
+        else:
+            domain[0], domain[1] = 0, 1
+
+    def set_unavailable(self, n, d, unavailable=True):
+        # nurse n does not work on day d
+        if unavailable:
+            self.unavailable.add((n, d))
+        else:
+            self.unavailable.discard((n, d))
+        for s in self.all_shifts:
+            self.set_domain(n, d, s)
+
+    def fix_assignment(self, n, d, s, fixed=True):
+        # nurse n works shift s on day d
+        if fixed:
+            self.fixed.add((n, d, s))
+        else:
+            self.fixed.discard((n, d, s))
+        self.set_domain(n, d, s)
+
+    def add_nurse(self):
+        # return the index of the new nurse, ValueError when the model has no free nurse
+        if all(self.active):
+            raise ValueError('the model is built for %i nurses' % self.max_nurses)
+        n = self.active.index(False)
+        self.active[n] = True
+        self.update_balance()
+        return n
+
+    def remove_nurse(self, n):
+        # ValueError when n is not in the roster or is its last nurse
+        if not 0 <= n < self.max_nurses or not self.active[n]:
+            raise ValueError('nurse %i is not in the roster' % n)
+        if sum(self.active) == 1:
+            raise ValueError('cannot remove the last nurse of the roster')
+        self.active[n] = False
+        self.update_balance()
+
+    def repaired_roster(self):
+        # previous roster with the deltas applied: the shifts a nurse can no longer work go to the available
+        # nurse with the fewest shifts, then shifts move from the busiest to the least busy nurse
+        # while the balance is violated, it may still be at the end
+        roster = self.roster.copy()
+        for n in range(self.max_nurses):
+            for d in self.all_days:
+                if not self.active[n] or (n, d) in self.unavailable:
+                    roster[n, d] = -1
+        for (n, d, s) in self.fixed:
+            roster[roster[:, d] == s, d] = -1
+            roster[n, d] = s
+        worked = (roster >= 0).sum(axis=1)
+        for d in self.all_days:
+            for s in set(self.all_shifts) - set(roster[:, d].tolist()):
+                candidates = [n for n in range(self.max_nurses)
+                              if self.active[n] and roster[n, d] < 0 and (n, d) not in self.unavailable]
+                if candidates:
+                    n = min(candidates, key=lambda nurse: worked[nurse])
+                    roster[n, d] = s
+                    worked[n] += 1
+        active = [n for n in range(self.max_nurses) if self.active[n]]
+        while True:
+            donor = max(active, key=lambda nurse: worked[nurse])
+            receiver = min(active, key=lambda nurse: worked[nurse])
+            if worked[donor] <= self.max_shifts_per_nurse and worked[receiver] >= self.min_shifts_per_nurse:
+                break
+            days = [d for d in self.all_days if roster[donor, d] >= 0 and roster[receiver, d] < 0 and
+                    (receiver, d) not in self.unavailable and (donor, d, roster[donor, d]) not in self.fixed]
+            if not days or worked[donor] - worked[receiver] < 2:
+                break
+            d = days[0]
+            roster[receiver, d] = roster[donor, d]
+            roster[donor, d] = -1
+            worked[donor] -= 1
+            worked[receiver] += 1
+        return roster
+
+    def solve(self):
+        # return True when a roster is found, the previous roster is kept otherwise
+        start_time = time.time()
+        self.model.ClearHints()
+        self.model.ClearObjective()
+        if self.roster is not None:
+            # every (day, shift) has exactly one nurse, so keeping the most previous assignments
+            # is minimizing the number of shift variables changed
+            hint = self.repaired_roster()
+            kept = []
+            for (n, d, s), var in self.shifts.items():
+                self.model.AddHint(var, hint[n, d] == s)
+                if self.roster[n, d] == s:
+                    kept.append(var)
+            self.model.Maximize(sum(kept))
+        self.status = self.solver.Solve(self.model)
+        self.solve_time = time.time() - start_time
+        if self.status != cp_model.OPTIMAL and self.status != cp_model.FEASIBLE:
+            return False
+        roster = np.full((self.max_nurses, self.num_days), -1, dtype=np.int64)
+        for (n, d, s), var in self.shifts.items():
+            if self.solver.BooleanValue(var):
+                roster[n, d] = s
+        self.changes = 0 if self.roster is None else int((roster != self.roster).sum())
+        self.roster = roster
+        return True
+
+    def print_result(self):
+        print('\nStatistics')
+        print('  - status         : %s' % self.solver.StatusName(self.status))
+        print('  - nurses         : %i' % sum(self.active))
+        print('  - changed days   : %i' % self.changes)
+        print('  - build time     : %f s' % self.build_time)
+        print('  - solve time     : %f s' % self.solve_time)
+
+
+def main():
+    scheduler = IncrementalNurseScheduler(num_nurses=20, num_shifts=3, num_days=28, max_nurses=22)
+    scheduler.solve()
+    scheduler.print_result()
+    # nurse 0 calls in sick for the first week
+    for d in range(7):
+        scheduler.set_unavailable(0, d)
+    scheduler.solve()
+    scheduler.print_result()
+    # one more nurse joins the team
+    scheduler.add_nurse()
+    scheduler.solve()
+    scheduler.print_result()
+
+
+if __name__ == '__main__':
+    main()
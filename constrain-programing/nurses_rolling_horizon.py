@@ -0,0 +1,141 @@
+"""Rolling horizon nurse scheduling: the horizon is solved window by window."""
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+class RollingHorizonNurseScheduling:
+    """ Same rules as NurseScheduling, one model per window of days.
+
+    Every window starts after the days committed so far and the last overlap days of a window are solved
+    again, with the previous values as hint, by the next one. The shifts a nurse worked in the committed days
+    are carried forward: at the end of a window the cumulative count of every nurse is bounded so that the
+    balance of the whole horizon stays reachable, and its distance to the even share of the days solved so
+    far is minimized.
+
+    No rule tells the shifts of a day apart, so a window only decides which nurses work every day:
+    works[(n, d)] replaces the num_shifts Booleans shifts[(n, d, s)] and the shifts of a day are then given
+    to its nurses in nurse order.
+    """
+
+    def __init__(self, num_nurses=4, num_shifts=3, num_days=3, window=7, overlap=2, time_limit=10, num_workers=0):
+        self.num_nurses = num_nurses
+        self.num_shifts = num_shifts
+        self.num_days = num_days
+        self.window = window  # days of a window
+        self.overlap = overlap  # last days of a window solved again by the next window
+        self.time_limit = time_limit  # seconds per window
+        self.num_workers = num_workers  # 0 for the solver default
+        self.all_nurses = range(self.num_nurses)
+        self.all_shifts = range(self.num_shifts)
+        # bounds of NurseScheduling on the shifts of a nurse over the whole horizon
+        self.min_shifts_per_nurse = (self.num_shifts * self.num_days) // self.num_nurses
+        self.max_shifts_per_nurse = -(-(self.num_shifts * self.num_days) // self.num_nurses)
+        self.roster = np.full((self.num_nurses, self.num_days), -1, dtype=np.int64)  # shift of nurse n on day d
+        self.worked = np.zeros(self.num_nurses, dtype=np.int64)  # shifts in the committed days
+        self.windows = []  # (first day, last day + 1, status, deviation, seconds) for every window
+        self.wall_time = 0
+        self.feasible = False
+
+    def hint(self, start, end):
+        # roster of days start..end - 1: the values of the previous window on the overlap days,
+        # then every day the shifts go to the nurses with the fewest shifts so far
+        hint = self.roster[:, start:end].copy()
+        worked = self.worked.copy()
+        for d in range(end - start):
+            if (hint[:, d] >= 0).sum() != self.num_shifts:
+                hint[:, d] = -1
+                nurses = np.argsort(worked, kind='stable')[:self.num_shifts]
+                hint[nurses, d] = np.arange(len(nurses))
+            worked += hint[:, d] >= 0
+        return hint
+
+    def solve_window(self, start, end):
+        # return the solver status and the roster of days start..end - 1
+        model = cp_model.CpModel()
+        works = {}
+        hint = self.hint(start, end)
+        for n in self.all_nurses:
+            for d in range(start, end):
+                works[(n, d)] = model.NewBoolVar('works_n%id%i' % (n, d))
+                model.AddHint(works[(n, d)], hint[n, d - start] >= 0)
+        for d in range(start, end):
+            model.Add(sum(works[(n, d)] for n in self.all_nurses) == self.num_shifts)
+
+        # even share of the days 0..end - 1, the remaining days may still move a nurse by one shift per day
+        low = (self.num_shifts * end) // self.num_nurses
+        high = -(-(self.num_shifts * end) // self.num_nurses)
+        deviation = []
+        for n in self.all_nurses:
+            total = int(self.worked[n]) + sum(works[(n, d)] for d in range(start, end))
+            model.Add(total <= self.max_shifts_per_nurse)
+            model.Add(total + (self.num_days - end) >= self.min_shifts_per_nurse)
+            over = model.NewIntVar(0, end - start, 'over_n%i' % n)
+            under = model.NewIntVar(0, end - start, 'under_n%i' % n)
+            model.Add(over >= total - high)
+            model.Add(under >= low - total)
+            deviation += [over, under]
+        model.Minimize(sum(deviation))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit
+        if self.num_workers:
+            solver.parameters.num_workers = self.num_workers
+        status = solver.Solve(model)
+        roster = np.full((self.num_nurses, end - start), -1, dtype=np.int64)
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            for d in range(start, end):
+                nurses = [n for n in self.all_nurses if solver.BooleanValue(works[(n, d)])]
+                roster[nurses, d - start] = np.arange(len(nurses))
+            self.windows.append((start, end, solver.StatusName(status), int(solver.ObjectiveValue()),
+                                 solver.WallTime()))
+        else:
+            self.windows.append((start, end, solver.StatusName(status), -1, solver.WallTime()))
+        return status, roster
+
+    def solve(self):
+        start_time = time.time()
+        step = max(self.window - self.overlap, 1)
+        start = 0
+        self.feasible = True
+        while start < self.num_days:
+            end = min(start + self.window, self.num_days)
+            status, roster = self.solve_window(start, end)
+            if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+                self.feasible = False
+                break
+            self.roster[:, start:end] = roster
+            commit = end if end == self.num_days else start + step
+            self.worked += (self.roster[:, start:commit] >= 0).sum(axis=1)
+            start = commit
+        self.wall_time = time.time() - start_time
+        return self.feasible
+
+    def shifts_per_nurse(self):
+        return (self.roster >= 0).sum(axis=1)
+
+    def is_balanced(self):
+        worked = self.shifts_per_nurse()
+        return bool(self.feasible and worked.min() >= self.min_shifts_per_nurse and
+                    worked.max() <= self.max_shifts_per_nurse)
+
+    def print_result(self):
+        worked = self.shifts_per_nurse()
+        print('\nStatistics')
+        for start, end, status, deviation, seconds in self.windows:
+            print('  - days %3i-%3i   : %-10s deviation %4i, time %f s' % (start, end - 1, status, deviation,
+                                                                           seconds))
+        print('  - shifts / nurse : %i - %i' % (worked.min(), worked.max()))
+        print('  - balanced       : %s' % self.is_balanced())
+        print('  - wall time      : %f s' % self.wall_time)
+
+
+def main():
+    nurse_scheduler = RollingHorizonNurseScheduling(num_nurses=100, num_shifts=30, num_days=56)
+    nurse_scheduler.solve()
+    nurse_scheduler.print_result()
+
+
+if __name__ == '__main__':
+    main()
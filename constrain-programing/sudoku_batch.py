@@ -0,0 +1,177 @@
+import multiprocessing as mp
+import sys
+import time
+
+from ortools.sat.python import cp_model
+
+from sudoku_propagation import BUDGET, DIGITS, BitmaskSudoku, format_grid, parse_puzzle
+
+# Puzzle files: one puzzle per line, box ** 4 cells row by row in the format of parse_puzzle, 81 for a 9x9 grid.
+# Malformed lines are reported as MALFORMED and solved by no one.
+# Every worker builds the AllDifferent model once, only the domains of the given cells change between puzzles.
+# The bitmask propagation solver runs first, CP-SAT only gets the puzzles over its node budget.
+
+UNSOLVABLE = 'unsolvable'
+MALFORMED = 'malformed'
+CP_SAT = 'cp-sat'
+
+
+class SudokuTemplate:
+    def __init__(self, box=3):
+        self.box = box
+        self.size = box * box
+        size = self.size
+        self.model = cp_model.CpModel()
+        self.cells = [self.model.NewIntVar(1, size, 'cell[%i]' % i) for i in range(size * size)]
+        x = [self.cells[size * i:size * i + size] for i in range(size)]
+        for i in range(size):
+            self.model.AddAllDifferent(x[i])
+        for j in range(size):
+            self.model.AddAllDifferent([x[i][j] for i in range(size)])
+        for row_idx in range(0, size, box):
+            for col_idx in range(0, size, box):
+                self.model.AddAllDifferent([x[row_idx + i][col_idx + j] for i in range(box) for j in range(box)])
+        # domains[i]: domain of cell i in the model proto, [low, high]
+        self.domains = [self.model.Proto().variables[cell.Index()].domain for cell in self.cells]
+        self.given = []  # cells fixed for the current puzzle
+        self.solver = cp_model.CpSolver()
+        self.solver.parameters.num_workers = 1  # the puzzles are spread over processes
+
+    def set_puzzle(self, values):
+        # values: size * size values row by row, 0 for an empty cell
+        for i in self.given:
+            self.domains[i][0] = 1
+            self.domains[i][1] = self.size
+        self.given = [i for i, v in enumerate(values) if v]
+        for i in self.given:
+            self.domains[i][0] = values[i]
+            self.domains[i][1] = values[i]
+
+    def solve(self, values):
+        # return the values of the solution, None when the puzzle has none
+        self.set_puzzle(values)
+        status = self.solver.Solve(self.model)
+        if status != cp_model.FEASIBLE and status != cp_model.OPTIMAL:
+            return None
+        solution = self.solver.ResponseProto().solution
+        return [solution[cell.Index()] for cell in self.cells]
+
+
+def read_puzzles(file_path):
+    # stream of puzzles, blank lines and lines starting with '#' are skipped
+    with open(file_path, 'r') as f:
+        for line in f:
+            puzzle = line.strip()
+            if puzzle and not puzzle.startswith('#'):
+                yield puzzle
+
+
+def chunks(puzzles, chunk_size):
+    chunk = []
+    for puzzle in puzzles:
+        chunk.append(puzzle)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+template = None  # SudokuTemplate of the worker
+propagation = None  # BitmaskSudoku of the worker, None to use CP-SAT only
+
+
+def init_worker(node_budget, box):
+    global template, propagation
+    template = SudokuTemplate(box)
+    propagation = None if node_budget is None else BitmaskSudoku(node_budget, box)
+
+
+def solve_puzzle(puzzle):
+    # return (solution or None, path), path is MALFORMED when the line is not a puzzle of the template size
+    values = parse_puzzle(puzzle, template.box)
+    if values is None:
+        return None, MALFORMED
+    if propagation is not None:
+        grid, path = propagation.solve_grid(values)
+        if path != BUDGET:
+            return None if grid is None else format_grid(grid), path
+    grid = template.solve(values)
+    return None if grid is None else format_grid(grid), CP_SAT
+
+
+def solve_chunk(chunk):
+    return [solve_puzzle(puzzle) for puzzle in chunk]
+
+
+def solve_puzzles(puzzles, processes=None, chunk_size=64, node_budget=64, box=3):
+    # generator of (solution or None, path solving it) in the order of puzzles
+    # node_budget: search nodes of the propagation solver before CP-SAT, None for CP-SAT only
+    # box: the puzzles are grids of box x box boxes
+    if box * box > len(DIGITS):
+        raise ValueError('puzzle strings hold at most %i values, not %i' % (len(DIGITS), box * box))
+    with mp.Pool(processes, initializer=init_worker, initargs=(node_budget, box)) as pool:
+        for result in pool.imap(solve_chunk, chunks(puzzles, chunk_size)):
+            for solution in result:
+                yield solution
+
+
+class SudokuBatch:
+    def __init__(self, file_path, output_path=None, processes=None, chunk_size=64, node_budget=64, box=3):
+        self.file_path = file_path
+        self.output_path = output_path  # None for the standard output
+        self.processes = processes  # None for one process per core
+        self.chunk_size = chunk_size  # puzzles sent to a worker at once
+        self.node_budget = node_budget  # search nodes of the propagation solver, None for CP-SAT only
+        self.box = box  # the puzzles are grids of box x box boxes
+        self.paths = {}  # path: number of puzzles it solved
+        self.count = 0
+        self.unsolvable = 0
+        self.malformed = 0  # lines which are not a puzzle
+        self.wall_time = 0
+
+    def solve(self):
+        start_time = time.time()
+        output = sys.stdout if self.output_path is None else open(self.output_path, 'w')
+        try:
+            for solution, path in solve_puzzles(read_puzzles(self.file_path), self.processes, self.chunk_size,
+                                                self.node_budget, self.box):
+                self.count += 1
+                if path == MALFORMED:
+                    self.malformed += 1
+                    output.write(MALFORMED + '\n')
+                    continue
+                self.paths[path] = self.paths.get(path, 0) + 1
+                if solution is None:
+                    self.unsolvable += 1
+                    solution = UNSOLVABLE
+                output.write(solution + '\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.wall_time = time.time() - start_time
+
+    def throughput(self):
+        return self.count / self.wall_time if self.wall_time > 0 else 0.0
+
+    def print_result(self):
+        print('\nStatistics')
+        print('  - puzzles        : %i' % self.count)
+        print('  - unsolvable     : %i' % self.unsolvable)
+        print('  - malformed      : %i' % self.malformed)
+        print('  - wall time      : %f s' % self.wall_time)
+        print('  - puzzles / s    : %f' % self.throughput())
+        for path, count in sorted(self.paths.items()):
+            print('  - %-15s: %i' % (path, count))
+
+
+def main():
+    file_path = '../data/sudoku.txt'
+    # file_path = input("puzzle file: ")
+    batch = SudokuBatch(file_path, output_path='sudoku_solutions.txt')
+    batch.solve()
+    batch.print_result()
+
+
+if __name__ == '__main__':
+    main()
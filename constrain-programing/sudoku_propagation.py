@@ -0,0 +1,192 @@
+# Sudoku by candidate bitmasks: bit v - 1 of rows[r], cols[c], boxes[b] is set when value v is placed in the unit.
+# Naked and hidden singles are applied until nothing changes, then a minimum remaining values search
+# branches on the cell with the fewest candidates. The search stops after node_budget nodes.
+# A grid of box x box boxes has size = box * box rows, columns and values, cells are numbered row by row.
+
+PROPAGATION = 'propagation'  # solved, or proved unsolvable, without branching
+SEARCH = 'search'  # solved by the search within the node budget
+BUDGET = 'budget'  # node budget exhausted
+
+TABLES = {}  # box: (row, col, box of every cell, units, value of every single bit)
+
+# puzzle strings: one character per cell row by row, value v is DIGITS[v - 1], '0' or '.' for an empty cell
+DIGITS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+EMPTY = '0.'
+
+
+def parse_puzzle(puzzle, box=3):
+    # values of the puzzle string, 0 for an empty cell, None when it is not a grid of box x box boxes
+    size = box * box
+    if len(puzzle) != size * size:
+        return None
+    digits = DIGITS[:size]
+    values = []
+    for c in puzzle.upper():
+        if c in EMPTY:
+            values.append(0)
+        elif c in digits:
+            values.append(digits.index(c) + 1)
+        else:
+            return None
+    return values
+
+
+def format_grid(values):
+    return ''.join(DIGITS[v - 1] for v in values)
+
+
+def tables(box):
+    if box not in TABLES:
+        size = box * box
+        row = [i // size for i in range(size * size)]
+        col = [i % size for i in range(size * size)]
+        box_of = [(row[i] // box) * box + col[i] // box for i in range(size * size)]
+        units = ([[r * size + c for c in range(size)] for r in range(size)] +
+                 [[r * size + c for r in range(size)] for c in range(size)] +
+                 [[i for i in range(size * size) if box_of[i] == b] for b in range(size)])
+        value = {1 << v: v + 1 for v in range(size)}
+        TABLES[box] = (row, col, box_of, units, value)
+    return TABLES[box]
+
+
+class BitmaskSudoku:
+    def __init__(self, node_budget=1000, box=3):
+        self.node_budget = node_budget
+        self.box = box
+        self.size = box * box
+        self.all = (1 << self.size) - 1
+        self.row, self.col, self.box_of, self.units, self.value = tables(box)
+        self.nodes = 0  # search nodes of the last puzzle
+        self.propagated = None  # grid after the first propagation of the last puzzle, 0 for an empty cell
+
+    def place(self, state, i, bit):
+        grid, rows, cols, boxes = state
+        grid[i] = self.value[bit]
+        rows[self.row[i]] |= bit
+        cols[self.col[i]] |= bit
+        boxes[self.box_of[i]] |= bit
+
+    def candidates(self, state, i):
+        _, rows, cols, boxes = state
+        return self.all & ~(rows[self.row[i]] | cols[self.col[i]] | boxes[self.box_of[i]])
+
+    def propagate(self, state):
+        # return False on a contradiction
+        grid, rows, cols, boxes = state
+        row, col, box_of, value, all_values = self.row, self.col, self.box_of, self.value, self.all
+        changed = True
+        while changed:
+            changed = False
+            # naked singles: a cell with one candidate
+            for i in range(len(grid)):
+                if grid[i]:
+                    continue
+                r, c, b = row[i], col[i], box_of[i]
+                candidates = all_values & ~(rows[r] | cols[c] | boxes[b])
+                if candidates == 0:
+                    return False
+                if candidates & (candidates - 1) == 0:
+                    grid[i] = value[candidates]
+                    rows[r] |= candidates
+                    cols[c] |= candidates
+                    boxes[b] |= candidates
+                    changed = True
+            # hidden singles: a value with one possible cell in a unit
+            for unit in self.units:
+                placed = once = twice = 0
+                for i in unit:
+                    if grid[i]:
+                        placed |= 1 << (grid[i] - 1)
+                    else:
+                        candidates = all_values & ~(rows[row[i]] | cols[col[i]] | boxes[box_of[i]])
+                        twice |= once & candidates
+                        once |= candidates
+                if once | placed != all_values:
+                    return False
+                single = once & ~twice & ~placed
+                while single:
+                    bit = single & -single
+                    single ^= bit
+                    for i in unit:
+                        r, c, b = row[i], col[i], box_of[i]
+                        if not grid[i] and not (rows[r] | cols[c] | boxes[b]) & bit:
+                            grid[i] = value[bit]
+                            rows[r] |= bit
+                            cols[c] |= bit
+                            boxes[b] |= bit
+                            changed = True
+                            break
+                    else:
+                        return False
+        return True
+
+    def search(self, state):
+        # return the solved grid, None when there is no solution or the budget is exhausted
+        grid, rows, cols, boxes = state
+        row, col, box_of, all_values = self.row, self.col, self.box_of, self.all
+        best = -1
+        best_count = self.size + 1
+        for i in range(len(grid)):
+            if not grid[i]:
+                count = bin(all_values & ~(rows[row[i]] | cols[col[i]] | boxes[box_of[i]])).count('1')
+                if count < best_count:
+                    best, best_count = i, count
+                    if count == 2:
+                        break
+        if best < 0:
+            return grid
+        candidates = self.candidates(state, best)
+        while candidates:
+            self.nodes += 1
+            if self.nodes > self.node_budget:
+                return None
+            bit = candidates & -candidates
+            candidates ^= bit
+            child = tuple(list(part) for part in state)
+            self.place(child, best, bit)
+            if self.propagate(child):
+                solved = self.search(child)
+                if solved is not None:
+                    return solved
+        return None
+
+    def solve_grid(self, values):
+        # values: size * size values row by row, 0 for an empty cell
+        # return (solved values or None, PROPAGATION / SEARCH / BUDGET)
+        # None with PROPAGATION or SEARCH: the puzzle has no solution
+        self.nodes = 0
+        self.propagated = None
+        state = ([0] * (self.size * self.size), [0] * self.size, [0] * self.size, [0] * self.size)
+        for i, v in enumerate(values):
+            if v:
+                bit = 1 << (v - 1)
+                if not self.candidates(state, i) & bit:
+                    return None, PROPAGATION
+                self.place(state, i, bit)
+        if not self.propagate(state):
+            return None, PROPAGATION
+        self.propagated = list(state[0])
+        if all(state[0]):
+            return state[0], PROPAGATION
+        grid = self.search(state)
+        if grid is not None:
+            return grid, SEARCH
+        return None, BUDGET if self.nodes > self.node_budget else SEARCH
+
+    def solve(self, puzzle):
+        # puzzle: string of size * size characters, see parse_puzzle, return the solution as such a string
+        # ValueError when the puzzle is malformed
+        values = parse_puzzle(puzzle, self.box)
+        if values is None:
+            raise ValueError('not a %ix%i sudoku: %r' % (self.size, self.size, puzzle))
+        grid, path = self.solve_grid(values)
+        return None if grid is None else format_grid(grid), path
+
+
+if __name__ == '__main__':
+    puzzle = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+    solver = BitmaskSudoku()
+    solution, path = solver.solve(puzzle)
+    print(path, solver.nodes)
+    for r in range(9):
+        print(' '.join(solution[r * 9:r * 9 + 9]))
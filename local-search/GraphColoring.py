@@ -1,136 +1,260 @@
 import random
-from copy import deepcopy
+import time
+
+import numpy as np
+
+from csr_graph import read_dimacs
+from initializers import INITIALIZERS
 
 
 class HillClimbing(object):
 
-    def __init__(self, problem, type='greedy'):
+    def __init__(self, problem, type='greedy', number_of_attempts=5, solve=True):
         self.problem = problem
         self.type = type
-        self.problem_solver(problem.initial_state())
+        self.number_of_attempts = number_of_attempts  # restarts allowed in random_restart mode
+        self.number_of_expanded_nodes = 0
+        self.number_of_visited_nodes = 0
+        self.number_of_restarts = 0
+        if solve:
+            self.problem_solver(problem.initial_state())
 
     def problem_solver(self, initial_state):
-        number_of_expanded_nodes = 0
-        number_of_visited_nodes = 0
-        best_state_found = False
-        current_state = initial_state
-        last_state = initial_state
-        number_of_attempts = 5
+        self.climb(initial_state)
+        print("Type of hill climbing: " + str(self.type))
+        print("Last state: " + str(self.problem.state()))
+        print("Number of conflicts: " + str(self.problem.heuristic()))
+        print("Number of visited nodes: " + str(self.number_of_visited_nodes))
+        print("Number of expanded nodes: " + str(self.number_of_expanded_nodes))
+        if self.type == 'random_restart':
+            print("Number of restarts: " + str(self.number_of_restarts))
+
+    def climb(self, initial_state, stop=None):
+        # climb until a local optimum, the problem is left in the best state found
+        # stop: optional callable, the climb is interrupted as soon as it returns True
+        self.problem.set_state(initial_state)
+        best_conflicts = self.problem.heuristic()
+        best_colors = None
         attempts = 0
-        while not best_state_found:
-            number_of_expanded_nodes = number_of_expanded_nodes + 1
-            neighbors = self.problem.successor(current_state)
-            number_of_visited_nodes = number_of_visited_nodes + len(neighbors)
-            if self.type == 'greedy':
-                current_state = self.find_neighbor_in_greedy_way(current_state, neighbors)
-                best_state_found = True if last_state == current_state else False
-            elif self.type == 'stochastic':
-                current_state = self.find_neighbor_in_stochastic_way(current_state, neighbors)
-                best_state_found = True if last_state == current_state else False
-            elif self.type == 'random_restart':
-                current_state = self.find_neighbor_in_greedy_way(current_state, neighbors)
-                if last_state == current_state:
-                    if attempts < number_of_attempts:
-                        best_state_found = True
-                    attempts = attempts + 1
+        while self.problem.heuristic() > 0:
+            if stop is not None and stop():
+                break
+            self.number_of_expanded_nodes = self.number_of_expanded_nodes + 1
+            moves = self.problem.successor()
+            self.number_of_visited_nodes = self.number_of_visited_nodes + len(moves)
+            if self.type == 'stochastic':
+                move = self.find_neighbor_in_stochastic_way(moves)
             elif self.type == 'first_choice':
-                current_state = self.find_neighbor_in_first_choice_way(current_state, neighbors)
-                best_state_found = True if last_state == current_state else False
-            if self.problem.heuristic(current_state) == 0:
-                best_state_found = True
-            last_state = current_state
-        print("Type of hill climbing: " + str(self.type))
-        print("Last state: " + str(current_state))
-        print("Number of visited nodes: " + str(number_of_visited_nodes))
-        print("Number of expanded nodes: " + str(number_of_expanded_nodes))
-
-    def find_neighbor_in_greedy_way(self, current_state, neighbors):
-        best_neighbor = current_state
-        best_heuristic = self.problem.heuristic(current_state)
-        for neighbor in neighbors:
-            heuristic = self.problem.heuristic(neighbor)
-            if heuristic < best_heuristic:
-                best_heuristic = heuristic
-                best_neighbor = neighbor
-        return best_neighbor
-
-    def find_neighbor_in_stochastic_way(self, current_state, neighbors):
-        valuable_neighbors = []
-        for neighbor in neighbors:
-            if self.problem.heuristic(neighbor) < self.problem.heuristic(current_state):
-                valuable_neighbors.append(neighbor)
-        return random.choice(valuable_neighbors) if len(valuable_neighbors) > 0 else current_state
-
-    def find_neighbor_in_first_choice_way(self, current_state, neighbors):
-        best_heuristic = self.problem.heuristic(current_state)
-        for neighbor in neighbors:
-            heuristic = self.problem.heuristic(neighbor)
-            if heuristic < best_heuristic:
-                return neighbor
-        return current_state
+                move = self.find_neighbor_in_first_choice_way(moves)
+            else:
+                move = self.find_neighbor_in_greedy_way(moves)
+            if move is not None:
+                self.problem.apply_move(move[0], move[1])
+                continue
+            # local optimum
+            if self.type != 'random_restart' or attempts >= self.number_of_attempts:
+                break
+            if self.problem.heuristic() < best_conflicts:
+                best_conflicts = self.problem.heuristic()
+                best_colors = self.problem.colors.copy()
+            attempts = attempts + 1
+            self.number_of_restarts = self.number_of_restarts + 1
+            self.problem.set_state(self.problem.random_state())
+        if best_colors is not None and best_conflicts < self.problem.heuristic():
+            self.problem.set_state(best_colors)
+        return self.problem.heuristic()
+
+    # Every neighbor is a move (node, color, delta), delta is the change of the number of conflicts
+    @staticmethod
+    def find_neighbor_in_greedy_way(moves):
+        best_move = None
+        best_delta = 0
+        for move in moves:
+            if move[2] < best_delta:
+                best_delta = move[2]
+                best_move = move
+        return best_move
+
+    @staticmethod
+    def find_neighbor_in_stochastic_way(moves):
+        valuable_moves = [move for move in moves if move[2] < 0]
+        return random.choice(valuable_moves) if len(valuable_moves) > 0 else None
+
+    @staticmethod
+    def find_neighbor_in_first_choice_way(moves):
+        for move in moves:
+            if move[2] < 0:
+                return move
+        return None
+
+
+class TabuCol(object):
+
+    def __init__(self, problem, max_iterations=100000, time_limit=60, tenure_base=10, tenure_ratio=0.6, seed=None,
+                 solve=True):
+        self.problem = problem
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit  # seconds
+        # a move back to the old color is tabu for random(0, tenure_base) + tenure_ratio * conflicting nodes
+        self.tenure_base = tenure_base
+        self.tenure_ratio = tenure_ratio
+        self.rng = np.random.default_rng(seed)
+        self.tabu = None  # tabu[i, c]: first iteration where node i may take color c again
+        self.best_colors = None
+        self.best_conflicts = None
+        self.iterations = 0
+        self.wall_time = 0
+        if solve:
+            self.problem_solver(problem.initial_state())
+
+    def problem_solver(self, initial_state):
+        self.search(initial_state)
+        print("Type of search: tabucol")
+        print("Last state: " + str(self.problem.state()))
+        print("Number of conflicts: " + str(self.best_conflicts))
+        print("Number of iterations: " + str(self.iterations))
+        print("Moves per second: " + str(self.moves_per_second()))
+
+    def search(self, initial_state, stop=None):
+        # the problem is left in the best state found
+        start_time = time.time()
+        problem = self.problem
+        problem.set_state(initial_state)
+        self.tabu = np.zeros((problem.graph.num_node, problem.number_of_colors + 1), dtype=np.int64)
+        self.best_colors = problem.colors.copy()
+        self.best_conflicts = problem.heuristic()
+        self.iterations = 0
+        big = problem.graph.num_edge + 1
+        while self.best_conflicts > 0 and self.iterations < self.max_iterations:
+            if time.time() - start_time >= self.time_limit or (stop is not None and stop()):
+                break
+            self.iterations += 1
+            move = self.best_move(big)
+            if move is None:
+                break
+            node, color = move
+            old_color = int(problem.colors[node])
+            problem.apply_move(node, color)
+            tenure = (int(self.rng.integers(0, self.tenure_base))
+                      + int(self.tenure_ratio * len(problem.conflicting_nodes)))
+            self.tabu[node, old_color] = self.iterations + tenure
+            if problem.heuristic() < self.best_conflicts:
+                self.best_conflicts = problem.heuristic()
+                self.best_colors = problem.colors.copy()
+        self.wall_time = time.time() - start_time
+        if problem.heuristic() > self.best_conflicts:
+            problem.set_state(self.best_colors)
+        return self.best_conflicts
+
+    def best_move(self, big):
+        # best non tabu (node, color) over conflicting nodes, a tabu move is allowed when it improves the best state
+        # when every move is tabu the best tabu move is taken
+        problem = self.problem
+        nodes = np.fromiter(problem.conflicting_nodes, dtype=np.int64, count=len(problem.conflicting_nodes))
+        table = problem.conflict_table[nodes]
+        own = problem.colors[nodes]
+        delta = table - table[np.arange(len(nodes)), own][:, None]
+        delta[:, 0] = big
+        delta[np.arange(len(nodes)), own] = big
+        aspiration = problem.heuristic() + delta < self.best_conflicts
+        allowed = np.where((self.tabu[nodes] > self.iterations) & ~aspiration, big, delta)
+        if allowed.min() < big:
+            delta = allowed
+        best = delta.min()
+        if best >= big:
+            return None
+        candidates = np.flatnonzero(delta == best)
+        index = int(candidates[self.rng.integers(len(candidates))])
+        row, color = divmod(index, delta.shape[1])
+        return int(nodes[row]), color
+
+    def moves_per_second(self):
+        return self.iterations / self.wall_time if self.wall_time > 0 else 0.0
 
 
 class Problem(object):
 
-    def __init__(self, graph, number_of_colors=3):
-        self.graph = graph
+    def __init__(self, graph, number_of_colors=3, initializer=None):
+        self.graph = graph  # CSRGraph
         self.number_of_colors = number_of_colors
+        self.initializer = initializer  # name in INITIALIZERS, None to start with every node in color 1
+        self.colors = None  # colors[i]: current color of node i, from 1 to number_of_colors
+        self.conflict_table = None  # conflict_table[i, c]: number of neighbors of node i having color c
+        self.conflicting_nodes = set()  # nodes having at least one neighbor with the same color
+        self.conflicts = 0  # number of edges whose two end points have the same color
 
     def initial_state(self):
-        node_colors = {}
-        for g in self.graph:
-            node_colors[g] = 1
-        return node_colors
-
-    def heuristic(self, node_colors):
-        score = 0
-        all_neighbors = self.find_all_neighbors()
-        for i in all_neighbors:
-            if node_colors[i[0]] == node_colors[i[1]]:
-                score = score + 1
-        return score
-
-    def successor(self, current_state):
-        all_neighbors = self.find_all_neighbors()
-        num_of_neighbors = {}
-        neighbors = []
-        for i in current_state:
-            num_of_neighbors[i] = 0
-        for neighbor in all_neighbors:
-            if current_state[neighbor[0]] == current_state[neighbor[1]]:
-                num_of_neighbors[neighbor[0]] = num_of_neighbors[neighbor[0]] + 1
-                num_of_neighbors[neighbor[1]] = num_of_neighbors[neighbor[1]] + 1
-        worst_node = max(num_of_neighbors, key=num_of_neighbors.get)
-        for i in range(1, self.number_of_colors + 1):
-            temp_state = deepcopy(current_state)
-            if temp_state[worst_node] != i:
-                temp_state[worst_node] = i
-                neighbors.append(temp_state)
-        return neighbors
+        if self.initializer is None:
+            return np.ones(self.graph.num_node, dtype=np.int32)
+        return INITIALIZERS[self.initializer](self.graph, self.number_of_colors)
+
+    def random_state(self, rng=None):
+        rng = np.random.default_rng() if rng is None else rng
+        return rng.integers(1, self.number_of_colors + 1, size=self.graph.num_node, dtype=np.int32)
 
-    def find_all_neighbors(self):
-        all_neighbors = []
-        for i in self.graph:
-            for j in graph[i]:
-                all_neighbors.append((i, j))
-        return all_neighbors
+    def set_state(self, node_colors):
+        # build conflict table in O(E), after that every move costs O(degree)
+        self.colors = np.array(node_colors, dtype=np.int32)
+        width = self.number_of_colors + 1
+        sources = np.repeat(np.arange(self.graph.num_node, dtype=np.int64), self.graph.degree())
+        self.conflict_table = np.bincount(sources * width + self.colors[self.graph.indices],
+                                          minlength=self.graph.num_node * width)
+        self.conflict_table = self.conflict_table.reshape(self.graph.num_node, width).astype(np.int32)
+        own = self.conflict_table[np.arange(self.graph.num_node), self.colors]
+        self.conflicting_nodes = set(np.flatnonzero(own).tolist())
+        self.conflicts = self.heuristic(self.colors)
+
+    def state(self):
+        return {i + 1: c for i, c in enumerate(self.colors.tolist())}
+
+    def heuristic(self, node_colors=None):
+        if node_colors is None:
+            return self.conflicts
+        node_colors = np.asarray(node_colors)
+        edges = self.graph.edges
+        return int(np.count_nonzero(node_colors[edges[:, 0]] == node_colors[edges[:, 1]]))
+
+    def move_delta(self, node, color):
+        row = self.conflict_table[node]
+        return int(row[color] - row[self.colors[node]])
+
+    def apply_move(self, node, color):
+        old_color = self.colors[node]
+        if old_color == color:
+            return
+        row = self.conflict_table[node]
+        self.conflicts += int(row[color] - row[old_color])
+        self.colors[node] = color
+        neighbors = self.graph.neighbors(node)
+        self.conflict_table[neighbors, old_color] -= 1
+        self.conflict_table[neighbors, color] += 1
+        neighbor_colors = self.colors[neighbors]
+        released = neighbors[(neighbor_colors == old_color) & (self.conflict_table[neighbors, old_color] == 0)]
+        self.conflicting_nodes.difference_update(released.tolist())
+        self.conflicting_nodes.update(neighbors[neighbor_colors == color].tolist())
+        if row[color] > 0:
+            self.conflicting_nodes.add(node)
+        else:
+            self.conflicting_nodes.discard(node)
+
+    def successor(self):
+        # moves recoloring the node with the most conflicts
+        if not self.conflicting_nodes:
+            return []
+        nodes = np.fromiter(self.conflicting_nodes, dtype=np.int64, count=len(self.conflicting_nodes))
+        worst_node = int(nodes[np.argmax(self.conflict_table[nodes, self.colors[nodes]])])
+        row = self.conflict_table[worst_node].tolist()
+        worst_color = int(self.colors[worst_node])
+        current = row[worst_color]
+        moves = []
+        for i in range(1, self.number_of_colors + 1):
+            if i != worst_color:
+                moves.append((worst_node, i, row[i] - current))
+        return moves
 
 
 def read_data(file_path='../data/graphColoring.txt'):
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    v = set()
-    pp, ee, num_node, num_edge = lines[5].split(' ')
-    edge = dict()
-    for i in range(1, int(num_node) + 1):
-        edge[i] = []
-    for line in lines[6:]:
-        e, i, j = line.split(' ')
-        if e == 'e':
-            v.add(int(i))
-            v.add(int(j))
-            edge[int(i)].append(int(j))
-    return edge
+    return read_dimacs(file_path)
 
 
 if __name__ == '__main__':
@@ -139,5 +263,7 @@ if __name__ == '__main__':
     graph = read_data(file_path)
     # num_color = 3
     num_color = int(input("how many color: "))
-    p = Problem(graph, num_color)
+    # initializer = 'dsatur'
+    initializer = input("initializer (empty, dsatur, largest_first, smallest_last): ") or None
+    p = Problem(graph, num_color, initializer)
     hc = HillClimbing(p, 'first_choice')
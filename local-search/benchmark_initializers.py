@@ -0,0 +1,54 @@
+import glob
+import os
+import time
+
+import numpy as np
+
+from chromatic_number import ChromaticNumberSearch
+from GraphColoring import read_data
+from initializers import INITIALIZERS, dsatur
+
+
+def is_dimacs(file_path):
+    with open(file_path, 'r') as f:
+        for line in f:
+            if line.strip() and line[0] != 'c':
+                return line.startswith('p edge')
+    return False
+
+
+def start_state(graph, name, number_of_colors, rng):
+    if name == 'ones':
+        return np.ones(graph.num_node, dtype=np.int32)
+    if name == 'random':
+        return rng.integers(1, number_of_colors + 1, size=graph.num_node, dtype=np.int32)
+    return INITIALIZERS[name](graph, number_of_colors)
+
+
+def benchmark(file_path, number_of_colors=None, time_limit=10, seed=0):
+    # compare iterations and wall time to the first coloring without conflict from every start
+    graph = read_data(file_path)
+    if number_of_colors is None:
+        number_of_colors = int(dsatur(graph).max(initial=1))
+    print('%s: %i nodes, %i edges, k = %i' % (os.path.basename(file_path), graph.num_node, graph.num_edge,
+                                            number_of_colors))
+    print('  %-14s %10s %10s %12s %12s' % ('start', 'conflicts', 'iterations', 'init (s)', 'total (s)'))
+    for name in ['ones', 'random'] + list(INITIALIZERS):
+        rng = np.random.default_rng(seed)
+        start_time = time.time()
+        state = start_state(graph, name, number_of_colors, rng)
+        init_time = time.time() - start_time
+        search = ChromaticNumberSearch(graph, number_of_colors, time_limit=time_limit, seed=seed)
+        conflicts = search.solve_fixed_k(state)
+        print('  %-14s %10i %10i %12f %12f' % (name, conflicts, search.iterations, init_time,
+                                               time.time() - start_time))
+
+
+def main():
+    for file_path in sorted(glob.glob('../data/*')):
+        if os.path.isfile(file_path) and not file_path.endswith('.csr') and is_dimacs(file_path):
+            benchmark(file_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+
+from subset_sum_batch import BatchSubsetSumTabuSearch, pad_instances
+from subset_sum_tabu_search import SubsetSumTabuSearch
+
+
+def create_instances(m, min_n=10, max_n=40, low=-1000, high=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    instances = [rng.integers(low, high, size=rng.integers(min_n, max_n + 1)) for _ in range(m)]
+    targets = rng.integers(low, high, size=m)
+    return instances, targets
+
+
+def benchmark(m=2000, max_it=300, seed=0):
+    # instances per second of the batch search against one SubsetSumTabuSearch per instance
+    instances, targets = create_instances(m, seed=seed)
+
+    start_time = time.time()
+    loop_objective = []
+    for a, k in zip(instances, targets):
+        tabu_search = SubsetSumTabuSearch(len(a), int(k), a, max_it=max_it, verbose=False, seed=seed,
+                                          exact_budget=None)
+        tabu_search.search()
+        loop_objective.append(tabu_search.best_sol_search_obj)
+    loop_time = time.time() - start_time
+
+    start_time = time.time()
+    A, lengths = pad_instances(instances)
+    batch = BatchSubsetSumTabuSearch(A, lengths, targets, max_it=max_it, seed=seed)
+    _, batch_objective = batch.search()
+    batch_time = time.time() - start_time
+
+    print('%i instances, %i iterations' % (m, max_it))
+    print('  %-8s %14s %14s %10s' % ('mode', 'instances/s', 'solved (obj 0)', 'mean obj'))
+    print('  %-8s %14.1f %14i %10.2f' % ('loop', m / loop_time, sum(o == 0 for o in loop_objective),
+                                        float(np.mean(loop_objective))))
+    print('  %-8s %14.1f %14i %10.2f' % ('batch', m / batch_time, int(np.sum(batch_objective == 0)),
+                                        float(np.mean(batch_objective))))
+
+
+if __name__ == '__main__':
+    benchmark()
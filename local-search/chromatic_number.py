@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+
+from GraphColoring import HillClimbing, Problem, TabuCol, read_data
+
+
+class ChromaticNumberSearch(object):
+
+    def __init__(self, graph, number_of_colors=None, type='stochastic', time_limit=60, seed=None, initializer=None):
+        self.graph = graph  # CSRGraph
+        # start from max degree + 1 colors when no value is given
+        self.number_of_colors = number_of_colors or int(graph.degree().max(initial=0)) + 1
+        self.type = type  # hill climbing mode or 'tabucol', used for every k
+        self.initializer = initializer  # constructive start for the first k, None for a random coloring
+        self.time_limit = time_limit  # seconds for the whole search
+        self.rng = np.random.default_rng(seed)
+        self.best_colors = None  # best feasible coloring found
+        self.best_number_of_colors = None
+        self.history = []  # (k, conflicts, iterations, seconds) for every k tried
+        self.iterations = 0  # hill climbing iterations of the last find_feasible call
+        self.start_time = 0
+
+    def time_is_over(self):
+        return time.time() - self.start_time >= self.time_limit
+
+    def solve(self):
+        self.start_time = time.time()
+        k = self.number_of_colors
+        problem = Problem(self.graph, k, self.initializer)
+        state = problem.random_state(self.rng) if self.initializer is None else problem.initial_state()
+        while k > 0 and not self.time_is_over():
+            k_start_time = time.time()
+            problem = Problem(self.graph, k)
+            conflicts = self.find_feasible(problem, state)
+            self.history.append((k, conflicts, self.iterations, time.time() - k_start_time))
+            if conflicts > 0:
+                break
+            self.best_colors = problem.colors.copy()
+            self.best_number_of_colors = k
+            if k == 1:
+                break
+            state = self.remove_color(problem)
+            k = k - 1
+        return self.best_number_of_colors
+
+    def solve_fixed_k(self, state):
+        # search a coloring with number_of_colors colors only, starting from state
+        self.start_time = time.time()
+        problem = Problem(self.graph, self.number_of_colors)
+        return self.find_feasible(problem, state)
+
+    def find_feasible(self, problem, state):
+        if self.type == 'tabucol':
+            tabu_search = TabuCol(problem, max_iterations=float('inf'), seed=self.rng.integers(2 ** 32), solve=False)
+            conflicts = tabu_search.search(state, stop=self.time_is_over)
+            self.iterations = tabu_search.iterations
+            return conflicts
+        # climb, then recolor the conflicting nodes at random and climb again until the time is over
+        hill_climbing = HillClimbing(problem, self.type, solve=False)
+        conflicts = hill_climbing.climb(state, stop=self.time_is_over)
+        while conflicts > 0 and not self.time_is_over():
+            state = problem.colors.copy()
+            nodes = np.fromiter(problem.conflicting_nodes, dtype=np.int64, count=len(problem.conflicting_nodes))
+            state[nodes] = self.rng.integers(1, problem.number_of_colors + 1, size=len(nodes), dtype=np.int32)
+            conflicts = hill_climbing.climb(state, stop=self.time_is_over)
+        self.iterations = hill_climbing.number_of_expanded_nodes
+        return conflicts
+
+    def remove_color(self, problem):
+        # recolor only the nodes of the least used color, every node takes its least conflicting color
+        k = problem.number_of_colors
+        usage = np.bincount(problem.colors, minlength=k + 1)[1:]
+        removed_color = int(np.argmin(usage)) + 1
+        for node in np.flatnonzero(problem.colors == removed_color).tolist():
+            row = problem.conflict_table[node].copy()
+            row[0] = row[removed_color] = problem.graph.num_edge + 1
+            problem.apply_move(node, int(np.argmin(row)))
+        state = problem.colors.copy()
+        state[state == k] = removed_color
+        return state
+
+    def print_result(self):
+        print("Number of colors: " + str(self.best_number_of_colors))
+        if self.best_colors is not None:
+            print("Last state: " + str({i + 1: c for i, c in enumerate(self.best_colors.tolist())}))
+        print('\nStatistics')
+        for k, conflicts, iterations, seconds in self.history:
+            print('  - k = %3i: conflicts %6i, iterations %8i, time %f s' % (k, conflicts, iterations, seconds))
+        print('  - wall time      : %f s' % sum(entry[3] for entry in self.history))
+
+
+def main():
+    # file_path = '../data/graphColoring.txt'
+    file_path = input("file path: ")
+    time_limit = float(input("time limit (s): "))
+    graph = read_data(file_path)
+    search = ChromaticNumberSearch(graph, time_limit=time_limit)
+    search.solve()
+    search.print_result()
+
+
+if __name__ == '__main__':
+    main()
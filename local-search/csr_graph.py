@@ -0,0 +1,134 @@
+import os
+from array import array
+
+import numpy as np
+
+CACHE_MAGIC = 0x43535247  # "CSRG"
+CACHE_VERSION = 1
+HEADER_SIZE = 8  # int64 fields: magic, version, num_node, num_edge, source size, source mtime, 2 reserved
+
+
+class CSRGraph(object):
+    """Undirected graph stored as CSR adjacency arrays, nodes are numbered from 0.
+
+    edges[e] = (u, v) with u < v holds every undirected edge once, indptr/indices
+    hold both directions so the neighbors of i are indices[indptr[i]:indptr[i + 1]].
+    """
+
+    def __init__(self, num_node, edges, indptr=None, indices=None):
+        self.num_node = num_node
+        self.edges = edges
+        self.num_edge = len(edges)
+        if indptr is None or indices is None:
+            indptr, indices = self.build_csr(num_node, edges)
+        self.indptr = indptr
+        self.indices = indices
+
+    @staticmethod
+    def build_csr(num_node, edges):
+        src = np.concatenate((edges[:, 0], edges[:, 1]))
+        dst = np.concatenate((edges[:, 1], edges[:, 0]))
+        order = np.argsort(src, kind='stable')
+        indices = dst[order].astype(np.int32)
+        indptr = np.zeros(num_node + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_node), out=indptr[1:])
+        return indptr, indices
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    def __len__(self):
+        return self.num_node
+
+
+def parse_dimacs(file_path):
+    # stream the file line by line, the header may have any number of comment lines
+    num_node = 0
+    u = array('i')
+    v = array('i')
+    with open(file_path, 'r') as f:
+        for line in f:
+            if not line or line[0] == 'c':
+                continue
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == 'p':
+                num_node = int(parts[2])
+            elif parts[0] == 'e':
+                i, j = int(parts[1]) - 1, int(parts[2]) - 1
+                if i == j:
+                    continue
+                if i > j:
+                    i, j = j, i
+                u.append(i)
+                v.append(j)
+    edges = np.empty((len(u), 2), dtype=np.int32)
+    edges[:, 0] = np.frombuffer(u, dtype=np.int32)
+    edges[:, 1] = np.frombuffer(v, dtype=np.int32)
+    if len(edges):
+        num_node = max(num_node, int(edges[:, 1].max()) + 1)
+        # files may list an edge in both directions, keep it once
+        keys = np.unique(edges[:, 0].astype(np.int64) * num_node + edges[:, 1])
+        edges = np.empty((len(keys), 2), dtype=np.int32)
+        edges[:, 0] = keys // num_node
+        edges[:, 1] = keys % num_node
+    return num_node, edges
+
+
+def cache_path_of(file_path):
+    return file_path + '.csr'
+
+
+def write_cache(graph, file_path, cache_path):
+    stat = os.stat(file_path)
+    header = np.array([CACHE_MAGIC, CACHE_VERSION, graph.num_node, graph.num_edge,
+                       stat.st_size, stat.st_mtime_ns, 0, 0], dtype=np.int64)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        header.tofile(f)
+        np.ascontiguousarray(graph.indptr, dtype=np.int64).tofile(f)
+        np.ascontiguousarray(graph.indices, dtype=np.int32).tofile(f)
+        np.ascontiguousarray(graph.edges, dtype=np.int32).tofile(f)
+    os.replace(tmp_path, cache_path)
+
+
+def read_cache(file_path, cache_path):
+    # return None when the cache is missing or older than the source file
+    if not os.path.exists(cache_path):
+        return None
+    header = np.fromfile(cache_path, dtype=np.int64, count=HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[0] != CACHE_MAGIC or header[1] != CACHE_VERSION:
+        return None
+    stat = os.stat(file_path)
+    if header[4] != stat.st_size or header[5] != stat.st_mtime_ns:
+        return None
+    num_node, num_edge = int(header[2]), int(header[3])
+    offset = HEADER_SIZE * 8
+    indptr = np.memmap(cache_path, dtype=np.int64, mode='r', offset=offset, shape=(num_node + 1,))
+    offset += (num_node + 1) * 8
+    indices = np.memmap(cache_path, dtype=np.int32, mode='r', offset=offset, shape=(2 * num_edge,)) \
+        if num_edge else np.zeros(0, dtype=np.int32)
+    offset += 2 * num_edge * 4
+    edges = np.memmap(cache_path, dtype=np.int32, mode='r', offset=offset, shape=(num_edge, 2)) \
+        if num_edge else np.zeros((0, 2), dtype=np.int32)
+    return CSRGraph(num_node, edges, indptr, indices)
+
+
+def read_dimacs(file_path, use_cache=True):
+    cache_path = cache_path_of(file_path)
+    if use_cache:
+        graph = read_cache(file_path, cache_path)
+        if graph is not None:
+            return graph
+    num_node, edges = parse_dimacs(file_path)
+    graph = CSRGraph(num_node, edges)
+    if use_cache:
+        try:
+            write_cache(graph, file_path, cache_path)
+        except OSError:
+            pass
+    return graph
@@ -0,0 +1,107 @@
+import heapq
+
+import numpy as np
+
+
+# Constructive colorings used as starting states of the local search.
+# Every function returns colors[i] in 1..number_of_colors for the nodes of a CSRGraph.
+# When number_of_colors is None the coloring is proper and uses as many colors as needed,
+# otherwise a node without free color takes the color shared with the fewest neighbors.
+
+
+def adjacency_lists(graph):
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    return [indices[indptr[i]:indptr[i + 1]] for i in range(graph.num_node)]
+
+
+def pick_color(neighbors, colors, number_of_colors):
+    used = set(colors[j] for j in neighbors)
+    color = 1
+    while color in used:
+        color += 1
+    if number_of_colors is None or color <= number_of_colors:
+        return color
+    counts = [0] * (number_of_colors + 1)
+    for j in neighbors:
+        if colors[j] > 0:
+            counts[colors[j]] += 1
+    return min(range(1, number_of_colors + 1), key=counts.__getitem__)
+
+
+def greedy_coloring(graph, order, number_of_colors=None):
+    adjacency = adjacency_lists(graph)
+    colors = [0] * graph.num_node
+    for i in order:
+        colors[i] = pick_color(adjacency[i], colors, number_of_colors)
+    return np.array(colors, dtype=np.int32)
+
+
+def largest_first(graph, number_of_colors=None):
+    order = np.argsort(-graph.degree(), kind='stable').tolist()
+    return greedy_coloring(graph, order, number_of_colors)
+
+
+def smallest_last_order(graph):
+    # repeatedly remove a node of minimum degree, bucket queue on the remaining degree
+    adjacency = adjacency_lists(graph)
+    degree = [len(neighbors) for neighbors in adjacency]
+    buckets = [set() for _ in range(max(degree, default=0) + 1)]
+    for i, d in enumerate(degree):
+        buckets[d].add(i)
+    removed = [False] * graph.num_node
+    order = []
+    low = 0
+    for _ in range(graph.num_node):
+        low = max(low - 1, 0)
+        while not buckets[low]:
+            low += 1
+        i = buckets[low].pop()
+        removed[i] = True
+        order.append(i)
+        for j in adjacency[i]:
+            if not removed[j]:
+                buckets[degree[j]].discard(j)
+                degree[j] -= 1
+                buckets[degree[j]].add(j)
+    order.reverse()
+    return order
+
+
+def smallest_last(graph, number_of_colors=None):
+    return greedy_coloring(graph, smallest_last_order(graph), number_of_colors)
+
+
+def dsatur(graph, number_of_colors=None):
+    # buckets[s]: heap of (-degree, node) for uncolored nodes of saturation s, stale entries are skipped
+    adjacency = adjacency_lists(graph)
+    colors = [0] * graph.num_node
+    neighbor_colors = [set() for _ in range(graph.num_node)]
+    degree = [len(neighbors) for neighbors in adjacency]
+    buckets = [[] for _ in range(max(degree, default=0) + 2)]
+    buckets[0] = [(-degree[i], i) for i in range(graph.num_node)]
+    heapq.heapify(buckets[0])
+    top = 0
+    for _ in range(graph.num_node):
+        while True:
+            while not buckets[top]:
+                top -= 1
+            d, i = heapq.heappop(buckets[top])
+            if colors[i] == 0 and len(neighbor_colors[i]) == top:
+                break
+        color = pick_color(adjacency[i], colors, number_of_colors)
+        colors[i] = color
+        for j in adjacency[i]:
+            if colors[j] == 0 and color not in neighbor_colors[j]:
+                neighbor_colors[j].add(color)
+                saturation = len(neighbor_colors[j])
+                heapq.heappush(buckets[saturation], (-degree[j], j))
+                top = max(top, saturation)
+    return np.array(colors, dtype=np.int32)
+
+
+INITIALIZERS = {
+    'dsatur': dsatur,
+    'largest_first': largest_first,
+    'smallest_last': smallest_last,
+}
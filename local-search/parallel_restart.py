@@ -0,0 +1,104 @@
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from GraphColoring import HillClimbing, Problem, read_data
+
+# shared state of a worker process, set by init_worker
+shared = dict()
+
+
+def init_worker(best_conflicts, best_colors, stop_event):
+    shared['best_conflicts'] = best_conflicts
+    shared['best_colors'] = best_colors
+    shared['stop_event'] = stop_event
+
+
+def restart_worker(file_path, number_of_colors, seed, time_limit, max_restarts):
+    # run randomized greedy climbs until a worker finds a coloring without conflict
+    start_time = time.time()
+    random.seed(int(seed))
+    rng = np.random.default_rng(seed)
+    graph = read_data(file_path)  # memory-mapped cache, cheap to open in every worker
+    problem = Problem(graph, number_of_colors)
+    hill_climbing = HillClimbing(problem, 'greedy', solve=False)
+    best_conflicts = shared['best_conflicts']
+    stop_event = shared['stop_event']
+    restarts = 0
+    while not stop_event.is_set() and time.time() - start_time < time_limit:
+        if max_restarts is not None and restarts >= max_restarts:
+            break
+        conflicts = hill_climbing.climb(problem.random_state(rng), stop=stop_event.is_set)
+        restarts = restarts + 1
+        if conflicts < best_conflicts.value:
+            with best_conflicts.get_lock():
+                if conflicts < best_conflicts.value:
+                    best_conflicts.value = conflicts
+                    shared['best_colors'][:] = problem.colors
+        if conflicts == 0:
+            stop_event.set()
+    return restarts
+
+
+class ParallelRandomRestart(object):
+
+    def __init__(self, file_path, number_of_colors=3, processes=None, time_limit=60, max_restarts=None, seed=0):
+        self.file_path = file_path
+        self.number_of_colors = number_of_colors
+        self.processes = processes or os.cpu_count()
+        self.time_limit = time_limit  # seconds
+        self.max_restarts = max_restarts  # per worker, None for no limit
+        self.seed = seed
+        self.best_conflicts = None
+        self.best_colors = None
+        self.restarts_per_worker = []
+        self.wall_time = 0
+
+    def solve(self):
+        graph = read_data(self.file_path)  # build the cache once before the workers open it
+        seeds = np.random.SeedSequence(self.seed).generate_state(self.processes)
+        ctx = mp.get_context()
+        best_conflicts = ctx.Value('q', graph.num_edge + 1)
+        best_colors = ctx.Array('i', graph.num_node, lock=False)
+        stop_event = ctx.Event()
+        start_time = time.time()
+        with ctx.Pool(self.processes, initializer=init_worker,
+                      initargs=(best_conflicts, best_colors, stop_event)) as pool:
+            self.restarts_per_worker = pool.starmap(
+                restart_worker, [(self.file_path, self.number_of_colors, seed, self.time_limit, self.max_restarts)
+                                 for seed in seeds])
+        self.wall_time = time.time() - start_time
+        self.best_conflicts = best_conflicts.value
+        self.best_colors = np.array(best_colors, dtype=np.int32)
+        return self.best_conflicts
+
+    def restarts(self):
+        return sum(self.restarts_per_worker)
+
+    def throughput(self):
+        return self.restarts() / self.wall_time if self.wall_time > 0 else 0.0
+
+    def print_result(self):
+        print("Best number of conflicts: %i" % self.best_conflicts)
+        print("Best state: " + str({i + 1: c for i, c in enumerate(self.best_colors.tolist())}))
+        print('\nStatistics')
+        print('  - workers        : %i' % self.processes)
+        print('  - restarts       : %i' % self.restarts())
+        print('  - wall time      : %f s' % self.wall_time)
+        print('  - restarts/s     : %f' % self.throughput())
+
+
+def main():
+    # file_path = '../data/graphColoring.txt'
+    file_path = input("file path: ")
+    num_color = int(input("how many color: "))
+    parallel_restart = ParallelRandomRestart(file_path, num_color)
+    parallel_restart.solve()
+    parallel_restart.print_result()
+
+
+if __name__ == '__main__':
+    main()
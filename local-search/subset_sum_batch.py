@@ -0,0 +1,128 @@
+import numpy as np
+
+
+class BatchSubsetSumTabuSearch:
+    # SubsetSumTabuSearch for m instances at once, every step is a numpy operation over the instances still running.
+    # A: (m, n) values padded with anything after lengths[i], k: (m,) targets
+    def __init__(self, A, lengths, k, max_it=300, seed=None):
+        self.A = np.asarray(A, dtype=np.int64)
+        self.m, self.n = self.A.shape
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.k = np.asarray(k, dtype=np.int64)
+        self.valid = np.arange(self.n)[None, :] < self.lengths[:, None]
+        self.A = np.where(self.valid, self.A, 0)
+        self.rng = np.random.default_rng(seed)
+        # strictly greater than every search objective, used as "no value"
+        self.total = int(np.abs(self.A).sum(axis=1).max(initial=0)) + int(np.abs(self.k).max(initial=0)) + 1
+
+        self.x = np.zeros((self.m, self.n), dtype=np.int8)
+        self.value = np.zeros(self.m, dtype=np.int64)  # running sum of every instance
+        self.flip = np.zeros((self.m, self.n), dtype=np.int64)  # flip[r, i]: change of value when x[r, i] is flipped
+        self.search_objective = np.zeros(self.m, dtype=np.int64)
+        self.stable = np.zeros(self.m, dtype=np.int64)
+
+        self.best_solution = np.zeros_like(self.x)
+        self.best_sol_search_obj = np.full(self.m, self.total, dtype=np.int64)
+        self.last_improve_sol = np.zeros_like(self.x)
+        self.last_improve_sol_obj = np.full(self.m, self.total, dtype=np.int64)
+
+        self.tbl = np.full(self.m, 4, dtype=np.int64)
+        self.tbl_min = 3
+        self.tbl_max = 5
+        self.tabu = np.zeros((self.m, self.n), dtype=np.int64)  # tabu[r, i]: last iteration where i is tabu
+        self.stable_limit = 30
+        self.restart_freq = 100
+
+        self.running = np.ones(self.m, dtype=bool)
+        self.gen_random_solution(np.arange(self.m))
+
+        self.it = 1
+        self.max_it = max_it
+
+    def gen_random_solution(self, rows):
+        self.x[rows] = self.rng.integers(0, 2, size=(len(rows), self.n), dtype=np.int8) & self.valid[rows]
+        self.cal_search_value(rows)
+
+    def cal_search_value(self, rows):
+        x = self.x[rows]
+        A = self.A[rows]
+        self.value[rows] = (A * x).sum(axis=1)
+        self.flip[rows] = np.where(x == 1, -A, A)
+        self.search_objective[rows] = np.abs(self.value[rows] - self.k[rows])
+
+    def search(self):
+        while self.it < self.max_it:
+            self.it += 1
+            rows = np.flatnonzero(self.running)
+            if len(rows) == 0:
+                break
+
+            improved = self.search_objective[rows] < self.best_sol_search_obj[rows]
+            r = rows[improved]
+            self.best_sol_search_obj[r] = self.search_objective[r]
+            self.best_solution[r] = self.x[r]
+            self.stable[r] = 0
+            finished = self.best_sol_search_obj[rows] == 0
+            self.running[rows[finished]] = False
+
+            restore = rows[~improved & (self.stable[rows] == self.stable_limit)]
+            self.x[restore] = self.last_improve_sol[restore]
+            self.cal_search_value(restore)
+            self.stable[restore] = 0
+
+            others = rows[~improved & (self.stable[rows] != self.stable_limit)]
+            self.stable[others] += 1
+            if self.it % self.restart_freq == 0:
+                self.gen_random_solution(others)
+                self.tabu[others] = 0
+
+            rows = rows[~finished]
+            if len(rows) == 0:
+                break
+
+            # score every flip of every running instance
+            objective_val = np.abs(self.flip[rows] + (self.value[rows] - self.k[rows])[:, None])
+            objective_val[~self.valid[rows] | (self.tabu[rows] >= self.it)] = self.total
+            index = np.argmin(objective_val, axis=1)
+            new_search_objective = objective_val[np.arange(len(rows)), index]
+
+            # every move is tabu
+            blocked = new_search_objective >= self.total
+            self.tabu[rows[blocked]] = 0
+            rows, index, new_search_objective = rows[~blocked], index[~blocked], new_search_objective[~blocked]
+
+            # Move
+            old_search_objective = self.search_objective[rows]
+            self.value[rows] += self.flip[rows, index]
+            self.flip[rows, index] = -self.flip[rows, index]
+            self.x[rows, index] = 1 - self.x[rows, index]
+            self.search_objective[rows] = new_search_objective
+
+            # Update tabu
+            self.tabu[rows, index] = self.it + self.tbl[rows]
+            better = new_search_objective < old_search_objective
+            self.tbl[rows] = np.where(better, np.maximum(self.tbl[rows] - 1, self.tbl_min),
+                                      np.minimum(self.tbl[rows] + 1, self.tbl_max))
+
+            # Update last improved solution
+            r = rows[better]
+            self.last_improve_sol_obj[r] = new_search_objective[better]
+            self.last_improve_sol[r] = self.x[r]
+            self.stable[r] = 0
+
+        improved = self.search_objective < self.best_sol_search_obj
+        self.best_sol_search_obj[improved] = self.search_objective[improved]
+        self.best_solution[improved] = self.x[improved]
+        return self.best_subsets(), self.best_sol_search_obj
+
+    def best_subsets(self):
+        return [np.flatnonzero(self.best_solution[r, :self.lengths[r]]) for r in range(self.m)]
+
+
+def pad_instances(instances):
+    # list of value lists to (padded values, lengths)
+    lengths = np.array([len(a) for a in instances], dtype=np.int64)
+    A = np.zeros((len(instances), lengths.max(initial=0)), dtype=np.int64)
+    for r, a in enumerate(instances):
+        A[r, :len(a)] = a
+    return A, lengths
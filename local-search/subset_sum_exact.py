@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+# Exact subset sum: find a subset S of A minimizing |sum(S) - k|.
+# - dynamic programming on the reachable sums, stored as bits of a python int,
+#   sums are shifted by the sum of the negative values so that bit 0 is the smallest reachable sum
+# - meet in the middle for small n with huge values
+# The cheaper method is chosen from an estimate of the number of machine words processed.
+
+MITM_MAX_N = 50
+DEFAULT_BUDGET = 10 ** 8  # machine words processed
+DEFAULT_MEMORY_LIMIT = 2 ** 28  # bytes kept for the reconstruction
+
+
+def dp_cost(A):
+    # layers are kept every block elements only, the others are recomputed during the reconstruction
+    width = sum(a for a in A if a > 0) - sum(a for a in A if a < 0) + 1
+    words = width // 64 + 1
+    block = math.isqrt(len(A)) + 1
+    return 2 * len(A) * words, (len(A) // block + 2 * block) * words * 8
+
+
+def mitm_cost(n):
+    half = 2 ** ((n + 1) // 2)
+    return half * (n + 1), half * 24
+
+
+def closest_bit(bits, index):
+    # index of the set bit of bits closest to index, bits != 0
+    best = -1
+    low = bits & ((1 << (index + 1)) - 1) if index >= 0 else 0
+    if low:
+        best = low.bit_length() - 1
+    high = bits >> (index + 1) if index >= 0 else bits
+    if high:
+        candidate = (high & -high).bit_length() - 1 + max(index + 1, 0)
+        if best < 0 or candidate - index < index - best:
+            best = candidate
+    return best
+
+
+def dp_step(reachable, a, base, nonempty):
+    source = reachable | base if nonempty else reachable
+    return reachable | (source << a if a >= 0 else source >> -a)
+
+
+def solve_dp(A, k, nonempty=False):
+    A = [int(a) for a in A]
+    n = len(A)
+    offset = -sum(a for a in A if a < 0)
+    base = 1 << offset  # the empty sum
+    block = math.isqrt(n) + 1
+    # checkpoints[b]: sums reachable with the first b * block elements, nonempty subsets only when nonempty is True
+    reachable = 0 if nonempty else base
+    checkpoints = []
+    for i, a in enumerate(A):
+        if i % block == 0:
+            checkpoints.append(reachable)
+        reachable = dp_step(reachable, a, base, nonempty)
+    if reachable == 0:
+        return None
+    index = closest_bit(reachable, k + offset)
+    selected = []
+    done = False
+    for b in range(len(checkpoints) - 1, -1, -1):
+        start = b * block
+        layers = [checkpoints[b]]
+        for a in A[start:min(start + block, n) - 1]:
+            layers.append(dp_step(layers[-1], a, base, nonempty))
+        # layers[j]: sums reachable with the first start + j elements
+        for j in range(len(layers) - 1, -1, -1):
+            i = start + j
+            if (layers[j] >> index) & 1:
+                continue
+            selected.append(i)
+            index -= A[i]
+            if nonempty and index == offset and not (layers[j] >> index) & 1:
+                done = True
+                break
+        if done:
+            break
+    selected.reverse()
+    return selected, abs(sum(A[i] for i in selected) - k)
+
+
+def half_sums(A):
+    sums = np.zeros(1, dtype=object if max((abs(int(a)) for a in A), default=0) * len(A) >= 2 ** 62 else np.int64)
+    masks = np.zeros(1, dtype=np.int64)
+    for i, a in enumerate(A):
+        sums = np.concatenate((sums, sums + a))
+        masks = np.concatenate((masks, masks | (1 << i)))
+    return sums, masks
+
+
+def solve_mitm(A, k, nonempty=False):
+    n = len(A)
+    if n == 0:
+        return None if nonempty else ([], abs(k))
+    middle = n // 2
+    left_sums, left_masks = half_sums(A[:middle])
+    right_sums, right_masks = half_sums(A[middle:])
+    order = np.argsort(right_sums, kind='stable')
+    right_sums = right_sums[order]
+    right_masks = right_masks[order]
+    # for every left sum, closest right sum to k - left sum
+    wanted = k - left_sums
+    position = np.searchsorted(right_sums, wanted)
+    below = np.clip(position - 1, 0, len(right_sums) - 1)
+    above = np.clip(position, 0, len(right_sums) - 1)
+    use_above = np.abs(right_sums[above] - wanted) < np.abs(right_sums[below] - wanted)
+    match = np.where(use_above, above, below)
+    error = np.abs(left_sums + right_sums[match] - k)
+    if nonempty:
+        # the empty left half is paired with a nonempty right half only
+        error[left_masks == 0] = abs(k) + int(np.abs(np.asarray(A, dtype=object)).sum()) + 1
+    best_left = int(np.argmin(error))
+    best = (error[best_left], int(left_masks[best_left]), int(right_masks[match[best_left]]))
+    if nonempty and len(right_sums) > 1:
+        nonempty_right = np.flatnonzero(right_masks != 0)
+        right_error = np.abs(right_sums[nonempty_right] - k)
+        j = int(np.argmin(right_error))
+        if right_error[j] < best[0]:
+            best = (right_error[j], 0, int(right_masks[nonempty_right[j]]))
+    if nonempty and best[1] == 0 and best[2] == 0:
+        return None
+    selected = [i for i in range(middle) if best[1] >> i & 1]
+    selected += [middle + i for i in range(n - middle) if best[2] >> i & 1]
+    return selected, int(best[0])
+
+
+def solve_exact(A, k, nonempty=False, budget=DEFAULT_BUDGET, memory_limit=DEFAULT_MEMORY_LIMIT):
+    # return (selected indices, |sum - k|), or None when both methods are over budget
+    A = [int(a) for a in A]
+    candidates = []
+    cost, memory = dp_cost(A)
+    if cost <= budget and memory <= memory_limit:
+        candidates.append((cost, solve_dp))
+    if len(A) <= MITM_MAX_N:
+        cost, memory = mitm_cost(len(A))
+        if cost <= budget and memory <= memory_limit:
+            candidates.append((cost, solve_mitm))
+    if not candidates:
+        return None
+    _, method = min(candidates, key=lambda candidate: candidate[0])
+    return method(A, k, nonempty)
+
+
+if __name__ == '__main__':
+    A = [-7, -3, -2, 5, 8, 3, 2, -1, 10]
+    k = 0
+    for method in [solve_dp, solve_mitm]:
+        selected, objective = method(A, k, nonempty=True)
+        print(method.__name__, "S = ", [A[i] for i in selected], "Search objective value ", objective)
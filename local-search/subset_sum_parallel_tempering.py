@@ -0,0 +1,148 @@
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+
+from subset_sum_exact import DEFAULT_BUDGET, solve_exact
+from subset_sum_simulated_annealing import SubsetSumAnnealing
+
+
+def chain_worker(connection, array, subset, target, seed, stop_event, check_every):
+    # one replica, every request (temperature, steps) runs steps moves at a constant temperature
+    annealing = SubsetSumAnnealing(array, subset, target, seed)
+    best_reported = float('inf')
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        temperature, steps = message
+        accepted_before = annealing.accepted_moves
+        proposed_before = annealing.proposed_moves
+        for _ in annealing.steps(temperature, 0, steps + 1, 1.0, report_every=check_every):
+            if stop_event.is_set():
+                break
+        if annealing.best_objective() == 0:
+            stop_event.set()
+        best = None
+        if annealing.best_objective() < best_reported:
+            best_reported = annealing.best_objective()
+            best = annealing.best_subset()
+        connection.send((annealing.objective(), annealing.best_objective(), best,
+                         annealing.accepted_moves - accepted_before, annealing.proposed_moves - proposed_before))
+    connection.close()
+
+
+class SubsetSumParallelTempering:
+    def __init__(self, array, target=0, temperatures=None, exchange_interval=1000, max_rounds=1000, time_limit=60,
+                 check_every=256, seed=0, exact_budget=DEFAULT_BUDGET):
+        self.array = list(array)
+        self.target = target
+        if temperatures is None:
+            # geometric ladder between the largest and the smallest absolute value, one chain per core
+            chains = max(os.cpu_count() or 1, 2)
+            high = float(max(abs(a) for a in self.array)) or 1.0
+            low = float(min(abs(a) for a in self.array if a != 0) if any(self.array) else 1.0)
+            low = min(low, high)
+            temperatures = [high * (low / high) ** (p / (chains - 1)) for p in range(chains)]
+        self.temperatures = sorted(temperatures, reverse=True)  # position 0 is the hottest
+        self.exchange_interval = exchange_interval  # moves of every chain between two swap passes
+        self.max_rounds = max_rounds
+        self.time_limit = time_limit  # seconds
+        self.check_every = check_every  # moves between two checks of the stop event
+        self.exact_budget = exact_budget  # exact solver is tried first within this budget, None to skip it
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.best_objective = None
+        self.best_subset = None
+        self.rounds = 0
+        self.wall_time = 0
+        self.accepted = [0] * len(self.temperatures)  # per temperature of the ladder
+        self.proposed = [0] * len(self.temperatures)
+        self.swap_accepted = [0] * (len(self.temperatures) - 1)  # per pair (p, p + 1) of the ladder
+        self.swap_proposed = [0] * (len(self.temperatures) - 1)
+
+    def random_subset(self):
+        n = len(self.array)
+        return self.rng.sample(range(n), self.rng.randint(1, n))
+
+    def solve(self):
+        start_time = time.time()
+        if self.exact_budget is not None:
+            exact = solve_exact(self.array, self.target, nonempty=True, budget=self.exact_budget)
+            if exact is not None:
+                self.best_subset = [self.array[i] for i in exact[0]]
+                self.best_objective = exact[1]
+                self.wall_time = time.time() - start_time
+                return self.best_subset
+        ctx = mp.get_context()
+        stop_event = ctx.Event()
+        chains = len(self.temperatures)
+        connections = []
+        processes = []
+        for c in range(chains):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=chain_worker, args=(child, self.array, self.random_subset(), self.target,
+                                                              self.seed * chains + c, stop_event, self.check_every))
+            process.start()
+            connections.append(parent)
+            processes.append(process)
+        ladder = list(range(chains))  # ladder[p]: chain running at temperatures[p]
+        energy = [0] * chains
+        try:
+            while self.rounds < self.max_rounds and time.time() - start_time < self.time_limit:
+                self.rounds += 1
+                for p in range(chains):
+                    connections[ladder[p]].send((self.temperatures[p], self.exchange_interval))
+                for p in range(chains):
+                    objective, best_objective, best, accepted, proposed = connections[ladder[p]].recv()
+                    energy[ladder[p]] = objective
+                    self.accepted[p] += accepted
+                    self.proposed[p] += proposed
+                    if best is not None and (self.best_objective is None or best_objective < self.best_objective):
+                        self.best_objective = best_objective
+                        self.best_subset = best
+                if self.best_objective == 0 or stop_event.is_set():
+                    break
+                self.swap(ladder, energy)
+        finally:
+            for connection in connections:
+                connection.send(None)
+            for process in processes:
+                process.join()
+        self.wall_time = time.time() - start_time
+        return self.best_subset
+
+    def swap(self, ladder, energy):
+        # exchange the chains of neighbor temperatures, even pairs and odd pairs alternate between rounds
+        for p in range(self.rounds % 2, len(self.temperatures) - 1, 2):
+            a, b = ladder[p], ladder[p + 1]
+            delta = (1.0 / self.temperatures[p] - 1.0 / self.temperatures[p + 1]) * (energy[a] - energy[b])
+            self.swap_proposed[p] += 1
+            if delta >= 0 or self.rng.random() < math.exp(delta):
+                ladder[p], ladder[p + 1] = b, a
+                self.swap_accepted[p] += 1
+
+    def acceptance_rates(self):
+        return [a / p if p else 0.0 for a, p in zip(self.accepted, self.proposed)]
+
+    def swap_rates(self):
+        return [a / p if p else 0.0 for a, p in zip(self.swap_accepted, self.swap_proposed)]
+
+    def print_result(self):
+        print("Best solution: ", self.best_subset, sum(self.best_subset))
+        print("Search objective value ", self.best_objective)
+        print('\nStatistics')
+        print('  - rounds         : %i' % self.rounds)
+        print('  - wall time      : %f s' % self.wall_time)
+        for temperature, rate in zip(self.temperatures, self.acceptance_rates()):
+            print('  - chain T = %14.4f: acceptance %.3f' % (temperature, rate))
+        for p, rate in enumerate(self.swap_rates()):
+            print('  - swap %i <-> %i: %.3f' % (p, p + 1, rate))
+
+
+if __name__ == "__main__":
+    array = [-7, -3, -2, 5, 8, 3, 2, -1, 10]
+    parallel_tempering = SubsetSumParallelTempering(array, temperatures=[1500, 150, 15, 1.5], exchange_interval=50)
+    parallel_tempering.solve()
+    parallel_tempering.print_result()
@@ -1,125 +1,158 @@
 import random
 import math
 
-iteration = 1
-
-
-# 1. Generate a random solution for the problem and call it S
-def generate_random_solution(array, length):
-    indices = sorted(random.sample(range(len(array)), length))
-    return [array[i] for i in indices]
-
-
-# 4. ~~~Compute the neighborhood of S~~~ and choose S' as the best solution in the neighborhood
-def get_neighborhood_1(array, subset):
-    neighborhood = []
-    # neighbours with one element less
-    if len(subset) > 1:
-        for index, item in enumerate(subset):
-            neighborhood.append(subset[:index] + subset[index+1:])
-    
-    # neighbours with one element more
-    if len(subset) < len(array):
-        for item in array:
-            if item not in subset:
-                neighborhood.append(subset + [item])
-
-    return neighborhood
-
-
-def get_neighborhood_2(array, subset):
-    neighborhood = []
-    # replace every element in subset with one element from set
-
-    for index, subset_item in enumerate(subset):
-        for set_item in array:
-            if set_item not in subset:
-                neighborhood.append(subset[:index] + [set_item] + subset[index+1:])
-
-    return neighborhood
-
-
-# 4. Compute the neighborhood of S and ~~~choose S' as the best solution in the neighborhood~~~
-def choose_random_sol_in_neighborhood(neighborhood):
-    return random.choice(neighborhood)
-
-
-# 5. If S' is better than S then go to step 6, else go to step 9
-# returns True if S' is better, False otherwise
-def compare_solutions(s, s_prime):
-    if s_prime:
-        return abs(sum(s_prime)) < abs(sum(s))
-    else:
-        return False
-
-# Calls steps 4, 5 and does the rest:
-# 6. S = S'
-# 7. Sbest = S
-# 8. Go to step 12
-# 9. Generate a random number R between 0 and 1
-# 10. If R is lower than e -abs(S' - S) / T then go to step 11, else go to step 12
-# 11. S = S'
-# 12. T = alfa * T (where alfa = 0.99, for example, or you can use another function that decreases T)
-# 13. If T has reached a certain value then go to step 14, else go to step 4
-# 14. Return Sbest as the best solution encountered
-def simulated_annealing(array, s, s_best, initial_temp, final_temp, temp_length, cooling_ratio):
-    global iteration
-    if sum(s) == 0:
-        return s_best
-    if initial_temp <= final_temp:
-        return s_best
-    if iteration == temp_length:
-        return s_best
-
-    print("\n~~~Iteration: {}~~~".format(iteration))
-
-    # Step 4
-    s_neighborhood_1 = get_neighborhood_1(array, s)
-    s_neighborhood_2 = get_neighborhood_2(array, s)
-    s_neighborhood = s_neighborhood_1 + s_neighborhood_2
-
-    print("Neighborhood: ", s_neighborhood)
-    s_prime = choose_random_sol_in_neighborhood(s_neighborhood)
-    print("Random solution in the neighborhood: \n", s_prime, sum(s_prime))
-
-    # Step 5
-    if compare_solutions(s, s_prime):
-        # Step 6 and 7
-        print("S' is better than S")
-
-        s = s_prime
-        s_best = s
-        
-    else:
-        # Step 9
-        r = random.uniform(0, 1)
-        print("exp", math.exp(-abs(sum(s_prime)- sum(s))/float(initial_temp)))
-        if r < math.exp(-abs(sum(s_prime)- sum(s))/float(initial_temp)):
-            s = s_prime
-    # Step 12
-    iteration += 1
-    initial_temp = cooling_ratio * initial_temp
-    print("Temp: ", initial_temp)
-    print("S", s, sum(s))
-    print("S_best", s_best, sum(s_best))
-    return simulated_annealing(array, s, s_best, initial_temp, final_temp, temp_length, cooling_ratio)
+from subset_sum_exact import DEFAULT_BUDGET, solve_exact
+
+
+# Moves of the neighborhood of S:
+# - remove one element (when |S| > 1)
+# - add one element which is not in S (when |S| < n)
+# - replace one element of S by one element which is not in S
+# A random neighbor is sampled directly, every neighbor of the neighborhood having the same probability,
+# so the neighborhood is never built.
+class SubsetSumAnnealing:
+    def __init__(self, array, subset_indices, target=0, seed=None):
+        self.values = list(array)
+        self.n = len(self.values)
+        self.target = target
+        self.rng = random.Random(seed)
+        selected = [False] * self.n
+        for i in subset_indices:
+            selected[i] = True
+        # inside / outside: indices in / not in S, position[i]: index of i in its list
+        self.inside = [i for i in range(self.n) if selected[i]]
+        self.outside = [i for i in range(self.n) if not selected[i]]
+        self.position = [0] * self.n
+        for p, i in enumerate(self.inside):
+            self.position[i] = p
+        for p, i in enumerate(self.outside):
+            self.position[i] = p
+        self.value = sum(self.values[i] for i in self.inside)  # running sum of S
+        self.best_value = self.value
+        self.best_inside = list(self.inside)
+        self.iteration = 0
+        self.temperature = 0
+        self.proposed_moves = 0  # over all calls of steps
+        self.accepted_moves = 0
+
+    def objective(self, value=None):
+        return abs((self.value if value is None else value) - self.target)
+
+    def best_objective(self):
+        return self.objective(self.best_value)
+
+    def best_subset(self):
+        return [self.values[i] for i in sorted(self.best_inside)]
+
+    def current_subset(self):
+        return [self.values[i] for i in sorted(self.inside)]
+
+    # 4. Compute the neighborhood of S and choose S' as a random solution in the neighborhood
+    def random_move(self):
+        # return (removed index or -1, added index or -1, sum of S')
+        size_in = len(self.inside)
+        size_out = len(self.outside)
+        remove_count = size_in if size_in > 1 else 0
+        add_count = size_out
+        replace_count = size_in * size_out
+        # int(random() * m) is a faster randrange(m), exact enough for the sizes used here
+        random_float = self.rng.random
+        r = int(random_float() * (remove_count + add_count + replace_count))
+        if r < remove_count:
+            removed = self.inside[r]
+            return removed, -1, self.value - self.values[removed]
+        r -= remove_count
+        if r < add_count:
+            added = self.outside[r]
+            return -1, added, self.value + self.values[added]
+        removed = self.inside[int(random_float() * size_in)]
+        added = self.outside[int(random_float() * size_out)]
+        return removed, added, self.value - self.values[removed] + self.values[added]
+
+    @staticmethod
+    def move_between(source, destination, position, i):
+        # O(1) removal by swapping with the last element
+        p = position[i]
+        last = source.pop()
+        if last != i:
+            source[p] = last
+            position[last] = p
+        position[i] = len(destination)
+        destination.append(i)
+
+    def apply_move(self, removed, added, value):
+        if removed >= 0:
+            self.move_between(self.inside, self.outside, self.position, removed)
+        if added >= 0:
+            self.move_between(self.outside, self.inside, self.position, added)
+        self.value = value
+
+    # 5. If S' is better than S then go to step 6, else go to step 9
+    # 6. S = S'
+    # 7. Sbest = S
+    # 9. Generate a random number R between 0 and 1
+    # 10. If R is lower than e -abs(S' - S) / T then go to step 11, else go to step 12
+    # 11. S = S'
+    # 12. T = alfa * T (where alfa = 0.99, for example, or you can use another function that decreases T)
+    # 13. If T has reached a certain value then go to step 14, else go to step 4
+    # 14. Return Sbest as the best solution encountered
+    def steps(self, initial_temp, final_temp, temp_length, cooling_ratio, report_every=1):
+        # yield (iteration, temperature, current objective, best objective) every report_every iterations
+        self.temperature = initial_temp
+        self.iteration = 1
+        while self.objective() != 0 and self.temperature > final_temp and self.iteration < temp_length:
+            removed, added, value = self.random_move()
+            current = abs(self.value - self.target)
+            candidate = abs(value - self.target)
+            self.proposed_moves += 1
+            if candidate < current:
+                self.apply_move(removed, added, value)
+                self.accepted_moves += 1
+                if candidate < self.best_objective():
+                    self.best_value = value
+                    self.best_inside = list(self.inside)
+            elif self.rng.random() < math.exp(-abs(value - self.value) / float(self.temperature)):
+                self.apply_move(removed, added, value)
+                self.accepted_moves += 1
+            self.iteration += 1
+            self.temperature = cooling_ratio * self.temperature
+            if self.iteration % report_every == 0:
+                yield self.iteration, self.temperature, self.objective(), self.best_objective()
+
+
+def simulated_annealing(array, s, initial_temp, final_temp, temp_length, cooling_ratio, target=0, seed=None,
+                        exact_budget=DEFAULT_BUDGET):
+    # s: indices of the initial solution, return the best subset found
+    # the exact solver is tried first within exact_budget, None to skip it
+    if exact_budget is not None:
+        exact = solve_exact(array, target, nonempty=True, budget=exact_budget)
+        if exact is not None:
+            return [array[i] for i in exact[0]]
+    annealing = SubsetSumAnnealing(array, s, target, seed)
+    for _ in annealing.steps(initial_temp, final_temp, temp_length, cooling_ratio, report_every=temp_length):
+        pass
+    return annealing.best_subset()
+
 
 if __name__ == "__main__":
     array = [-7, -3, -2, 5, 8, 3, 2, -1, 10]
 
-    # Step 1
-    s = generate_random_solution(array, random.randint(1, len(array)))
+    # Step 1, generate a random solution for the problem and call it S
+    s = sorted(random.sample(range(len(array)), random.randint(1, len(array))))
 
-    # Step 2
-    s_best = s
+    # Step 2, Sbest = S
+    annealing = SubsetSumAnnealing(array, s)
 
     # Step 3
     initial_temp = 1500
     temp_length = 500
     cooling_ratio = 0.9
     final_temp = 0.01
-    
-    print("Random solution: ", s, sum(s))
-    s_final = simulated_annealing(array, s, s_best, initial_temp, final_temp, temp_length, cooling_ratio)
 
-    print("Final solution: ", s_final, sum(s_final))
\ No newline at end of file
+    print("Random solution: ", annealing.current_subset(), annealing.value)
+    for iteration, temperature, current, best in annealing.steps(initial_temp, final_temp, temp_length,
+                                                                 cooling_ratio):
+        print("Iteration: %i, temp: %f, S: %i, S_best: %i" % (iteration, temperature, current, best))
+
+    s_final = annealing.best_subset()
+    print("Final solution: ", s_final, sum(s_final))
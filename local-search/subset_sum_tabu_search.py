@@ -1,97 +1,101 @@
-from random import randint
+from collections import deque
+
 import numpy as np
 
+from subset_sum_exact import DEFAULT_BUDGET, solve_exact
+
 
 class SubsetSumTabuSearch:
-    def __init__(self, n, k, A):
+    def __init__(self, n, k, A, max_it=300, verbose=True, seed=None, exact_budget=DEFAULT_BUDGET):
         self.n = n
-        self.A = A
+        self.A = np.asarray(A, dtype=np.int64)
         self.k = k
-        self.x = []
+        self.verbose = verbose
+        self.exact_budget = exact_budget  # exact solver is tried first within this budget, None to skip it
+        self.rng = np.random.default_rng(seed)
         self.stable = 0
-        self.total = sum(A)
-        self.min_value = min(A)
-        self.x = np.zeros(n, dtype=int)
-        self.x[:] = -1
+        # strictly greater than every search objective, used as "no value"
+        self.total = int(np.abs(self.A).sum()) + abs(k) + 1
+        self.min_value = self.A.min()
+        self.x = np.zeros(n, dtype=np.int8)
+        self.value = 0  # running sum of the selected elements
+        self.flip = np.zeros(n, dtype=np.int64)  # flip[i]: change of value when x[i] is flipped
+        self.buffer = np.zeros(n, dtype=np.int64)
         self.search_objective = 0
 
         self.best_solution = np.zeros_like(self.x)
-        self.best_solution[:] = -1
-
         self.best_sol_search_obj = self.total
 
         self.last_improve_sol = np.zeros_like(self.x)
-        self.last_improve_sol[:] = -1
         self.last_improve_sol_obj = self.total
 
-        self.tabu = np.zeros_like(self.x)
         self.tbl = 4
         self.tbl_min = 3
         self.tbl_max = 5
+        # tabu[i]: last iteration where flipping x[i] is tabu, tabu_list: indices which may still be tabu
+        self.tabu = np.zeros(n, dtype=np.int64)
+        self.tabu_list = deque(maxlen=self.tbl_max + 1)
         self.stable_limit = 30
 
         self.restart_freq = 100
 
         self.gen_random_solution()
-        self.print_current_solution()
+        if self.verbose:
+            self.print_current_solution()
 
         self.it = 1
-        self.max_it = 300
+        self.max_it = max_it
 
     def gen_random_solution(self):
-        value = 0
-        for i in range(self.n):
-            self.x[i] = randint(0, 1)
-            value += self.x[i] * A[i]
-
-        self.search_objective = abs(value - self.k)
+        self.x[:] = self.rng.integers(0, 2, size=self.n, dtype=np.int8)
+        self.cal_search_value()
 
     def print_current_solution(self):
         print("---------------------------------------------------")
-        S = list()
-        for i in range(self.n):
-            if self.x[i] == 1:
-                S.append(i)
+        S = np.flatnonzero(self.x).tolist()
 
         print("S = ", S)
         print("Search objective value ", self.search_objective)
 
     def cal_search_value(self):
-        value = 0
-        for i in range(n):
-            value += self.x[i] * A[i]
-        self.search_objective = abs(value - self.k)
+        self.value = int(self.A[self.x == 1].sum())
+        np.copyto(self.flip, self.A)
+        np.negative(self.A, out=self.flip, where=self.x == 1)
+        self.search_objective = abs(self.value - self.k)
         return self.search_objective
 
     def search_next_solution(self):
-        select_index = -1
-        new_search_objective = self.total
-
-        for i in range(n):
-            if self.tabu[i] > 0:
-                continue
-
-            self.x[i] = 1 - self.x[i]
-            objective_val = self.cal_search_value()
-            if objective_val < new_search_objective:
-                new_search_objective = objective_val
-                select_index = i
-            self.x[i] = 1 - self.x[i]
+        # flipping x[i] adds A[i] when x[i] = 0 and removes it when x[i] = 1, all flips are scored at once
+        objective_val = np.add(self.flip, self.value - self.k, out=self.buffer)
+        np.abs(objective_val, out=objective_val)
+        for i in self.tabu_list:
+            if self.tabu[i] >= self.it:
+                objective_val[i] = self.total
+        select_index = int(np.argmin(objective_val))
+        new_search_objective = int(objective_val[select_index])
+        if new_search_objective >= self.total:
+            return -1, self.total
         return select_index, new_search_objective
 
     def search(self):
+        if self.exact_budget is not None and self.solve_exact():
+            if self.verbose:
+                self.print_best_solution()
+            return
         while (self.it < self.max_it):
             self.it += 1
             if self.search_objective < self.best_sol_search_obj:
                 self.best_sol_search_obj = self.search_objective
-                for i in range(self.n):
-                    self.best_solution[i] = self.x[i]
+                np.copyto(self.best_solution, self.x)
                 self.stable = 0
+                if self.best_sol_search_obj == 0:
+                    break
             elif self.stable == self.stable_limit:
-                print("Restore")
+                if self.verbose:
+                    print("Restore")
                 self.search_objective = self.last_improve_sol_obj
-                for i in range(self.n):
-                    self.x[i] = self.last_improve_sol[i]
+                np.copyto(self.x, self.last_improve_sol)
+                self.cal_search_value()
 
                 self.stable = 0
             else:
@@ -99,29 +103,33 @@ class SubsetSumTabuSearch:
 
                 # Restart
                 if self.it % self.restart_freq == 0:
-                    print("Restarted ")
+                    if self.verbose:
+                        print("Restarted ")
 
                     # Sinh lời giải ngẫu nhiên
                     self.gen_random_solution()
 
                     # Update tabu
-                    for i in range(self.n):
-                        self.tabu[i] = 0
+                    self.tabu_list.clear()
 
             old_search_objective = self.search_objective
             index, new_search_objective = self.search_next_solution()
-            print("index = ", index, " new search objective = ", new_search_objective)
+            if index < 0:
+                # every move is tabu
+                self.tabu_list.clear()
+                continue
+            if self.verbose:
+                print("index = ", index, " new search objective = ", new_search_objective)
 
             # Move
+            self.value += int(self.flip[index])
+            self.flip[index] = -self.flip[index]
             self.x[index] = 1 - self.x[index]
             self.search_objective = new_search_objective
 
-            # Update tabu
-            for i in range(n):
-                if self.tabu[i] > 0:
-                    self.tabu[i] -= 1
-
-            self.tabu[index] = self.tbl
+            # Update tabu, index stays tabu during the next tbl iterations
+            self.tabu[index] = self.it + self.tbl
+            self.tabu_list.append(index)
 
             if new_search_objective < old_search_objective:
                 if self.tbl > self.tbl_min:
@@ -132,23 +140,39 @@ class SubsetSumTabuSearch:
 
             # Update last improved solution
             if new_search_objective < old_search_objective:
-                print("Improved")
+                if self.verbose:
+                    print("Improved")
 
                 self.last_improve_sol_obj = new_search_objective
-                for i in range(n):
-                    self.last_improve_sol[i] = self.x[i]
+                np.copyto(self.last_improve_sol, self.x)
 
                 self.stable = 0
-        self.print_best_solution()
+        if self.search_objective < self.best_sol_search_obj:
+            self.best_sol_search_obj = self.search_objective
+            np.copyto(self.best_solution, self.x)
+        if self.verbose:
+            self.print_best_solution()
+
+    def solve_exact(self):
+        exact = solve_exact(self.A, self.k, nonempty=True, budget=self.exact_budget)
+        if exact is None:
+            return False
+        selected, objective = exact
+        self.best_solution[:] = 0
+        self.best_solution[selected] = 1
+        self.best_sol_search_obj = objective
+        if self.verbose:
+            print("Exact solution")
+        return True
 
     def print_best_solution(self):
-        S = list()
-        for i in range(n):
-            if self.best_solution[i] == 1:
-                S.append(A[i])
+        S = self.A[self.best_solution == 1].tolist()
 
         print("\n Best solution :")
-        print("S = ", S)
+        if len(S) <= 100:
+            print("S = ", S)
+        else:
+            print("|S| = ", len(S))
         print("Search objective value ", self.best_sol_search_obj)
 
 
@@ -1,20 +1,59 @@
+import os
+import sys
+import time
+
 from ortools.linear_solver import pywraplp
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.distance import cached_distance_matrix
+from common.minimum_latency import MinimumLatencyHeuristic, latency
+from common.model_cache import MIP, ModelCache
+from common.parsers.cache import load_instance
+
 
 class MinimumLatencyProblem:
-    def __init__(self, data=None, v=None):
+    def __init__(self, data=None, v=None, cache=None, use_native=True, native_time_limit=10):
         self.num_node = len(v)
         self.data = data
         self.all_node = v
         self.x = dict()  # IntVar: x[i, j] = 1 if move from i to j else 0
         self.y = dict()  # IntVar: y[i, j, k] = 1 if move from i, j in step k
+        self.cache = cache  # ModelCache, None to build the model every time
+        self.use_native = use_native  # run the GRASP + VND engine first, its tour is the start of the MIP
+        self.native_time_limit = native_time_limit  # seconds
+        self.hint_tour = None  # nodes in visit order, given to the MIP as hint
+        self.upper_bound = None  # latency of hint_tour
+        self.native_time = 0
+        self.build_time = 0
         self.solver = None
         self.objective = None
 
     def create_solver(self):
         self.solver = pywraplp.Solver.CreateSolver('SCIP')
 
+    def build_model(self):
+        # create_solver, create_var, add_constrain and set_objective,
+        # the proto is loaded from the cache when it was built before
+        start_time = time.time()
+        self.create_solver()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(MIP, self, self.data, self.all_node)
+            variables = self.cache.load_mip(key, self.solver)
+            if variables is not None:
+                self.x = variables['x']
+                self.y = variables['y']
+                self.objective = self.solver.Objective()
+                self.build_time = time.time() - start_time
+                return
+        self.create_var()
+        self.add_constrain()
+        self.set_objective()
+        self.build_time = time.time() - start_time
+        if key is not None:
+            self.cache.store_mip(key, self.solver, {'x': self.x, 'y': self.y}, self.build_time)
+
     def create_var(self):
         # Creates variables.
         for i in self.all_node:
@@ -70,11 +109,38 @@ class MinimumLatencyProblem:
                     if j != i:
                         self.objective.SetCoefficient(self.y[i, j, k], (self.num_node - k) * self.data[i, j])
 
+    def add_hint(self):
+        # start from the hint tour and cut every solution worse than it
+        step = {node: k for k, node in enumerate(self.hint_tour, 1)}
+        arcs = set((i, j, step[i]) for i, j in zip(self.hint_tour, self.hint_tour[1:]))
+        variables = list(self.x.values()) + list(self.y.values())
+        values = [1 if step[i] == k else 0 for (i, k) in self.x] + [1 if key in arcs else 0 for key in self.y]
+        self.solver.SetHint(variables, values)
+        ct = self.solver.Constraint(-self.solver.infinity(), self.upper_bound + 1e-6 * abs(self.upper_bound), "ub")
+        for k in range(1, self.num_node):
+            for i in self.all_node:
+                for j in self.all_node:
+                    if j != i:
+                        ct.SetCoefficient(self.y[i, j, k], (self.num_node - k) * self.data[i, j])
+
+    def solve_native(self):
+        # GRASP + VND on the distances of the nodes, the tour is kept as hint and upper bound for the MIP
+        start_time = time.time()
+        nodes = sorted(self.all_node)
+        heuristic = MinimumLatencyHeuristic(self.data[np.ix_(nodes, nodes)], time_limit=self.native_time_limit)
+        tour, self.upper_bound = heuristic.solve()
+        self.hint_tour = [nodes[u] for u in tour.tolist()]
+        self.native_time = time.time() - start_time
+        self.print_path("GRASP + VND solution:", self.hint_tour)
+        print("Native time: %f s" % self.native_time)
+
     def solve(self):
-        self.create_solver()
-        self.create_var()
-        self.add_constrain()
-        self.set_objective()
+        if self.use_native:
+            self.solve_native()
+        self.build_model()
+        if self.hint_tour is not None:
+            self.add_hint()
+        print("Build time: %f s" % self.build_time)
         print('solving')
         status = self.solver.Solve()
         if status in [pywraplp.Solver.FEASIBLE, pywraplp.Solver.OPTIMAL]:
@@ -82,6 +148,15 @@ class MinimumLatencyProblem:
         else:
             print("cannot solve")
 
+    def print_path(self, title, path):
+        print(title)
+        print("Cost: %8.3f" % latency(self.data, path))
+        print('Path: ' + ' -> '.join([str(v) for v in path]))
+        print('Edges:')
+        for u, v in zip(path, path[1:]):
+            print("\t%3d -> %3d: %6.3f" % (u, v, self.data[u, v]))
+        print("_________________________________________________\n")
+
     def print_result(self):
         print("IP solution:")
         print("Cost: %8.3f" % (self.objective.Value()))
@@ -103,30 +178,26 @@ class MinimumLatencyProblem:
         print("_________________________________________________\n")
         return path, edges_list
 
-def read_data(file_name, start, end):
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
-    coordinates = dict()
+def read_data(file_name):
+    instance = load_instance(file_name)
     data = dict()
-    data['V'] = set()
-    for line in lines[start:end]:
-        i, x, y = line.split(' ')
-        coordinates[int(i)] = np.array([float(x), float(y)])
-        data['V'].add(int(i))
-    data['C'] = np.zeros((len(data['V']) + 1, len(data['V']) + 1))
-    for i in data['V']:
-        for j in data['V']:
-            data['C'][i, j] = np.sqrt(((coordinates[i] - coordinates[j]) ** 2).sum())
+    data['V'] = set(instance['node_ids'].tolist())
+    # coordinates[i]: coordinates of node i, row 0 is not a node
+    coordinates = np.zeros((instance['node_ids'].max() + 1, 2))
+    coordinates[instance['node_ids']] = instance['coordinates']
+    data['C'] = cached_distance_matrix(coordinates, name=os.path.splitext(os.path.basename(file_name))[0])
     return data
 
 
 def main():
     path = "../data/Bai2_dj38.tsp"
     # path = input("path to file: ")
-    data = read_data(path, start=10, end=48)
+    data = read_data(path)
     # Creates the solver.
-    shortest_path = MinimumLatencyProblem(data=data["C"], v=data["V"])
+    cache = ModelCache()
+    shortest_path = MinimumLatencyProblem(data=data["C"], v=data["V"], cache=cache)
     shortest_path.solve()
+    cache.print_stats()
 
 
 if __name__ == '__main__':
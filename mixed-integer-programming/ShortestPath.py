@@ -1,12 +1,34 @@
+import os
+import sys
+import time
+
 from ortools.linear_solver import pywraplp
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.model_cache import MIP, ModelCache
+from common.shortest_path import build_arcs, print_path, read_data, solve_native
+
 
 class ShortestPath:
-    def __init__(self, edges=None, v=None, start=1, end=1):
+    def __init__(self, edges=None, v=None, start=1, end=1, out_arcs=None, in_arcs=None, use_native=True,
+                 backend='scip', cache=None):
         self.start = start
         self.end = end
         self.num_node = len(v)
         self.edges = edges
+        if out_arcs is None or in_arcs is None:
+            out_arcs, in_arcs = build_arcs(edges)
+        self.out_arcs = out_arcs  # out_arcs[i]: nodes j with an arc (i, j)
+        self.in_arcs = in_arcs  # in_arcs[i]: nodes j with an arc (j, i)
+        self.use_native = use_native  # solve with the label correcting engine instead of the model
+        # 'scip': full model, 'glop': flow LP before the native engine and the full model, which only run when
+        # the LP optimum is not a simple path
+        self.backend = backend
+        self.cache = cache  # ModelCache, None to build the model every time
+        self.native_time = 0
+        self.lp_time = 0
+        self.build_time = 0
+        self.solve_time = 0
         self.all_node = v
         self.nodes_var = {}  # IntVar: var in solver
         self.solver = None
@@ -15,6 +37,25 @@ class ShortestPath:
     def create_solver(self):
         self.solver = pywraplp.Solver.CreateSolver('SCIP')
 
+    def build_model(self):
+        # create_solver, create_var, add_constrain and set_objective,
+        # the proto is loaded from the cache when it was built before
+        self.create_solver()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(MIP, self, self.edges, self.start, self.end, self.num_node)
+            variables = self.cache.load_mip(key, self.solver)
+            if variables is not None:
+                self.nodes_var = variables['nodes_var']
+                self.objective = self.solver.Objective()
+                return
+        start_time = time.time()
+        self.create_var()
+        self.add_constrain()
+        self.set_objective()
+        if key is not None:
+            self.cache.store_mip(key, self.solver, {'nodes_var': self.nodes_var}, time.time() - start_time)
+
     def create_var(self):
         # Creates variables.
         for (s, t) in self.edges:
@@ -23,18 +64,20 @@ class ShortestPath:
             self.nodes_var[i] = self.solver.IntVar(0, self.num_node, "y[%i]" % i)
 
     def add_constrain(self):
+        # flow conservation, every row is built from the arc lists of its node
         for i in range(self.num_node):
+            out_flow = self.solver.Sum([self.nodes_var[(i, j)] for j in self.out_arcs[i]])
+            in_flow = self.solver.Sum([self.nodes_var[(j, i)] for j in self.in_arcs[i]])
             if i == self.start:
-                self.solver.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) == 1)
-                self.solver.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 0)
+                self.solver.Add(out_flow == 1)
+                self.solver.Add(in_flow == 0)
             elif i == self.end:
-                self.solver.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) == 0)
-                self.solver.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 1)
+                self.solver.Add(out_flow == 0)
+                self.solver.Add(in_flow == 1)
             else:
-                self.solver.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) - sum(
-                    self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) == 0)
-                self.solver.Add(sum(self.nodes_var[(i, j)] for j in range(self.num_node) if (i, j) in self.edges) <= 1)
-                self.solver.Add(sum(self.nodes_var[(j, i)] for j in range(self.num_node) if (j, i) in self.edges) <= 1)
+                self.solver.Add(out_flow - in_flow == 0)
+                self.solver.Add(out_flow <= 1)
+                self.solver.Add(in_flow <= 1)
 
         for (s, t) in self.edges:
             self.solver.Add(self.nodes_var[t] - self.nodes_var[s] - self.nodes_var[(s, t)] >= 0)
@@ -46,15 +89,74 @@ class ShortestPath:
         self.objective.SetMinimization()
 
     def solve(self):
-        self.create_solver()
-        self.create_var()
-        self.add_constrain()
-        self.set_objective()
+        if self.backend == 'glop' and self.solve_lp():
+            return
+        if self.use_native:
+            self.native_time = solve_native(self.edges, len(self.out_arcs), self.start, self.end)
+            return
+        start_time = time.time()
+        self.build_model()
+        self.build_time = time.time() - start_time
+        start_time = time.time()
         status = self.solver.Solve()
+        self.solve_time = time.time() - start_time
         if status == pywraplp.Solver.OPTIMAL:
             self.print_result()
         else:
             print("cannot solve")
+        print("Build time: %f s" % self.build_time)
+        print("Solve time: %f s" % self.solve_time)
+
+    def solve_lp(self):
+        # flow rows only: without the y rows the matrix is totally unimodular and GLOP returns an integral vertex
+        # return True when this vertex is a simple path from start to end. Every simple path is feasible for the LP,
+        # so it is then a shortest simple path. It is not always the optimum of the full model: the y rows forbid
+        # every arc on a cycle, so the two only agree when the graph has no cycle through the path
+        start_time = time.time()
+        solver = pywraplp.Solver.CreateSolver('GLOP')
+        flow = {}
+        for (s, t) in self.edges:
+            flow[(s, t)] = solver.NumVar(0, 1, 'Flow_From_%i_To_%i' % (s, t))
+        for i in range(self.num_node):
+            out_flow = solver.Sum([flow[(i, j)] for j in self.out_arcs[i]])
+            in_flow = solver.Sum([flow[(j, i)] for j in self.in_arcs[i]])
+            supply = 1 if i == self.start else -1 if i == self.end else 0
+            solver.Add(out_flow - in_flow == supply)
+        objective = solver.Objective()
+        for arc in self.edges:
+            objective.SetCoefficient(flow[arc], self.edges[arc])
+        objective.SetMinimization()
+        status = solver.Solve()
+        self.lp_time = time.time() - start_time
+        path = None
+        if status == pywraplp.Solver.OPTIMAL:
+            path = self.flow_path({arc: flow[arc].solution_value() for arc in self.edges})
+        if path is None:
+            print("LP relaxation is not a simple path, solve the full model")
+            print("LP time: %f s" % self.lp_time)
+            return False
+        print_path(self.edges, "LP solution:", path)
+        print("LP time: %f s" % self.lp_time)
+        return True
+
+    def flow_path(self, values, tolerance=1e-6):
+        # path from start to end carrying the whole flow, None when values is fractional or holds a cycle
+        next_node = {}
+        for (i, j), value in values.items():
+            if min(value, 1 - value) > tolerance:
+                return None
+            if value > 0.5:
+                if i in next_node:
+                    return None
+                next_node[i] = j
+        path = [self.start]
+        while path[-1] != self.end:
+            if path[-1] not in next_node or len(path) > len(next_node):
+                return None
+            path.append(next_node[path[-1]])
+        if len(path) - 1 != len(next_node):
+            return None
+        return path
 
     def print_result(self):
         # Statistics.
@@ -80,29 +182,16 @@ class ShortestPath:
         print("_________________________________________________\n")
 
 
-def read_data(file_name):
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
-    data = dict()
-    data['V'] = set()
-    data['E'] = dict()
-    for line in lines[1:]:
-        i, j, c = line.split(';')
-        data['V'].add(int(i) - 1)
-        data['V'].add(int(j) - 1)
-        data['E'][int(i) - 1, int(j) - 1] = float(c)
-    data['s'] = min(data['V'])
-    data['t'] = max(data['V'])
-    return data
-
-
 def main():
     path = "../data/Bai1_25_l_1.txt"
     # path = input("path to file: ")
     data = read_data(path)
     # Creates the solver.
-    shortest_path = ShortestPath(edges=data["E"], v=data["V"], start=data["s"], end=data["t"])
+    cache = ModelCache()
+    shortest_path = ShortestPath(edges=data["E"], v=data["V"], start=data["s"], end=data["t"],
+                                 out_arcs=data["out"], in_arcs=data["in"], cache=cache)
     shortest_path.solve()
+    cache.print_stats()
 
 
 if __name__ == '__main__':
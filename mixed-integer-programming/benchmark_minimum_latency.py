@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+from MinimumLatencyProblem import read_data
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.distance import distance_matrix
+from common.minimum_latency import MinimumLatencyHeuristic
+
+# (name, file)
+INSTANCES = [
+    ('wi29', '../data/Bai2_wi29.tsp'),
+    ('dj38', '../data/Bai2_dj38.tsp'),
+]
+
+
+def random_distance(num_node, seed=0):
+    # euclidean distances of num_node random points of a 10000 x 10000 square
+    return distance_matrix(np.random.default_rng(seed).random((num_node, 2)) * 10000)
+
+
+def benchmark(sizes=(500, 1000, 2000, 5000), time_limit=10):
+    # latency of the nearest neighbor path and of GRASP + VND, which stops after time_limit seconds
+    print('  %-10s %8s %16s %16s %10s %10s' % ('instance', 'nodes', 'nearest', 'GRASP + VND', 'iterations',
+                                               'time (s)'))
+    instances = []
+    for name, file_name in INSTANCES:
+        data = read_data(file_name)
+        nodes = sorted(data['V'])
+        instances.append((name, data['C'][np.ix_(nodes, nodes)]))
+    for num_node in sizes:
+        instances.append(('random', random_distance(num_node)))
+    for name, distance in instances:
+        heuristic = MinimumLatencyHeuristic(distance, time_limit=time_limit)
+        heuristic.set_tour(heuristic.construct(1))
+        nearest = heuristic.cost
+        heuristic.solve()
+        print('  %-10s %8i %16.1f %16.1f %10i %10.2f' % (name, len(distance), nearest, heuristic.best_cost,
+                                                       heuristic.iterations, heuristic.run_time))
+
+
+if __name__ == '__main__':
+    benchmark()
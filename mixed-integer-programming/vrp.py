@@ -1,66 +1,71 @@
-﻿import math
+﻿import os
+import sys
 import time
 
 from ortools.linear_solver import pywraplp
 import matplotlib.pyplot as plt
+import numpy as np
 
-
-def trim(s):
-    # replace multi space, tab and new line by space
-    # return string
-    new_str = s.replace("\n", " ").replace("\r\n", " ")
-    new_str = ' '.join(new_str.split())
-    new_str = new_str.strip()
-    return new_str
-
-
-def convert_data(data):
-    # convert list data string to dict of int
-    # return dict
-    dataset = dict()
-    for d in data:
-        ds = d.split()
-        if len(ds) == 3:
-            if ds[0].isnumeric() and ds[1].isnumeric() and ds[2].isnumeric():
-                a = dict()
-                a['x'] = int(ds[1])
-                a['y'] = int(ds[2])
-                dataset[int(ds[0])] = a
-        if len(ds) == 2:
-            if ds[0].isnumeric() and ds[1].isnumeric():
-                dataset[int(ds[0])]['d'] = int(ds[1])
-    return dataset
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.distance import distance_matrix
+from common.model_cache import MIP, ModelCache
+from common.parsers.cache import load_instance
 
 
 def read_dataset(filename="vrp/P-n20-k4.vrp"):
-    # read file and convert data to dict
-    # return data as dict
-    path = f"./data/{filename}"
-    path = path.format(filename=filename)
-    with open(path, 'r') as f:
-        lines = f.readlines()
-    data = []
-    for line in lines:
-        striped = trim(line)
-        data.append(striped)
-    dataset = convert_data(data)
-    return dataset
+    # read a CVRPLIB file
+    # return (dict: node id -> {'x', 'y': coordinates, 'd': demand}, vehicle capacity or None)
+    # integral coordinates are ints
+    instance = load_instance("./data/%s" % filename)
+    dataset = dict()
+    for i, (x, y), d in zip(instance['node_ids'].tolist(), instance['coordinates'].tolist(),
+                            instance['demands'].tolist()):
+        dataset[i] = {'x': int(x) if x.is_integer() else x, 'y': int(y) if y.is_integer() else y, 'd': d}
+    capacity = instance['specification'].get('CAPACITY')
+    return dataset, None if capacity is None else int(capacity)
 
 
 class JobScheduling:
-    def __init__(self, position=None, num_staff=None):
+    def __init__(self, position=None, num_staff=None, cache=None):
         self.num_staff = num_staff
         self.position = position
         self.num_customer = len(position)
+        # distance[i, j]: distance between customer i and customer j, customer i is position[i + 1]
+        self.distance = distance_matrix(np.array([[position[i + 1]['x'], position[i + 1]['y']]
+                                                  for i in range(self.num_customer)]))
         self.y = {}  # IntVar
         self.x = {}  # IntVar
         self.solver = None  # Ortool Solver
         self.objective = None  # Ortool objective
         self.obj = 0
+        self.cache = cache  # ModelCache, None to build the model every time
+        self.build_time = 0
 
     def create_solver(self):
         self.solver = pywraplp.Solver.CreateSolver('SCIP')
 
+    def build_model(self):
+        # create_solver, create_var, add_constrain and set_objective,
+        # the proto is loaded from the cache when it was built before
+        start_time = time.time()
+        self.create_solver()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(MIP, self, self.position, self.num_staff)
+            variables = self.cache.load_mip(key, self.solver)
+            if variables is not None:
+                self.y = variables['y']
+                self.x = variables['x']
+                self.obj = variables['obj'][0]
+                self.build_time = time.time() - start_time
+                return
+        self.create_var()
+        self.add_constrain()
+        self.set_objective()
+        self.build_time = time.time() - start_time
+        if key is not None:
+            self.cache.store_mip(key, self.solver, {'y': self.y, 'x': self.x, 'obj': {0: self.obj}}, self.build_time)
+
     def create_var(self):
         # Creates variables.
 
@@ -109,22 +114,15 @@ class JobScheduling:
         # Objective
         for k in range(self.num_staff):
             self.solver.Add(
-                sum(self.x[k, i, j] * (
-                        self.distince(self.position[i + 1], self.position[j + 1]) + self.position[j + 1]['d'])
+                sum(self.x[k, i, j] * (self.distance[i, j] + self.position[j + 1]['d'])
                     for i in range(self.num_customer) for j in range(self.num_customer)) <= self.obj)
 
-    @staticmethod
-    def distince(f, t):
-        return math.sqrt(math.pow(f['x'] - t['x'], 2) + math.pow(f['y'] - t['y'], 2))
-
     def set_objective(self):
         self.solver.Minimize(self.obj)
 
     def solve(self):
-        self.create_solver()
-        self.create_var()
-        self.add_constrain()
-        self.set_objective()
+        self.build_model()
+        print("Build time: %s s" % self.build_time)
         print("solving")
         print("-------------------")
         start_time = time.time()
@@ -189,11 +187,14 @@ def main():
     # path = input("path to file: ")
     print("reading data ...")
     print("-----------------")
-    data = read_dataset(file_name)
+    data, capacity = read_dataset(file_name)
     print(data)
+    print("capacity: %s" % capacity)
     # Creates the solver.
-    shortest_path = JobScheduling(position=data, num_staff=4)
+    cache = ModelCache()
+    shortest_path = JobScheduling(position=data, num_staff=4, cache=cache)
     s = shortest_path.solve()
+    cache.print_stats()
     s += 'end \n -----------------\n'
     with open("../result/vrp.txt", 'a') as f:
         f.write(file_name + '\n')